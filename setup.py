@@ -41,9 +41,16 @@ setup(
         "tqdm>=4.65.0",
     ],
     extras_require={
+        "fast": [
+            "numba>=0.58",
+        ],
+        "pyav": [
+            "av>=10.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
+            "pytest-xdist>=3.5.0",
             "black>=23.0.0",
             "flake8>=6.0.0",
             "pyinstaller>=5.13.0",
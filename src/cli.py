@@ -5,7 +5,10 @@ Command-line interface for converting videos to YouTube Shorts format.
 """
 
 import argparse
+import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -18,6 +21,7 @@ from core import (
     ConversionOptions,
     ProcessingError,
     ValidationError,
+    VideoInfo,
     convert_to_shorts,
     get_video_info,
 )
@@ -25,6 +29,12 @@ from core import (
 # Supported video extensions
 VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm"}
 
+# Videos listed per page in interactive selection
+PAGE_SIZE = 10
+
+# Per-folder metadata cache, so browsing the same folder again needs no probing
+CACHE_FILENAME = ".sh0rtifier_cache.json"
+
 
 def find_videos(folder: Path) -> list[Path]:
     """
@@ -36,32 +46,101 @@ def find_videos(folder: Path) -> list[Path]:
     Returns:
         List of video file paths
     """
-    if not folder.exists():
+    # scandir would raise on a file path, so treat it like a missing folder
+    if not folder.is_dir():
         return []
 
-    videos = []
-    for ext in VIDEO_EXTENSIONS:
-        videos.extend(folder.glob(f"*{ext}"))
-        videos.extend(folder.glob(f"*{ext.upper()}"))
+    # Single directory pass; suffix check is case-insensitive
+    with os.scandir(folder) as entries:
+        return sorted(
+            Path(entry.path)
+            for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS
+        )
+
+
+def _load_cache(folder: Path) -> dict:
+    """Load the folder's metadata cache (empty if missing or unreadable)"""
+    try:
+        with open(folder / CACHE_FILENAME, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
 
-    return sorted(videos)
+def _save_cache(folder: Path, cache: dict) -> None:
+    """Write the folder's metadata cache, ignoring read-only folders"""
+    try:
+        with open(folder / CACHE_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+def _cached_info(video: Path, entry, size: int, mtime_ns: int) -> Optional[VideoInfo]:
+    """VideoInfo from a cache entry, or None if it is stale or malformed"""
+    try:
+        if entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            return None
+        info = entry["info"]
+        # Coerce the fields so a wrongly typed value is a miss, not a later crash
+        return VideoInfo(
+            path=video,
+            duration=float(info["duration"]),
+            width=int(info["width"]),
+            height=int(info["height"]),
+            fps=float(info["fps"]),
+            has_audio=bool(info["has_audio"]),
+            rotation=int(info.get("rotation", 0)),
+        )
+    except (KeyError, TypeError, ValueError):
+        # Hand-edited or written by another version: probe the file again
+        return None
 
 
-def paginate_list(items: list, page_size: int = 10) -> list[list]:
+def probe_videos(videos: list[Path], cache: Optional[dict] = None) -> list:
     """
-    Split list into pages
+    Probe video files concurrently
 
     Args:
-        items: List of items
-        page_size: Items per page
+        videos: Video file paths
+        cache: Metadata cache keyed by file name; entries whose size or
+            mtime changed are probed again and updated in place
 
     Returns:
-        List of pages
+        List with a VideoInfo or the raised error for each video
     """
-    pages = []
-    for i in range(0, len(items), page_size):
-        pages.append(items[i : i + page_size])
-    return pages
+
+    def probe(video: Path):
+        try:
+            stat = video.stat()
+            entry = cache.get(video.name) if cache is not None else None
+            info = _cached_info(video, entry, stat.st_size, stat.st_mtime_ns)
+            if info is not None:
+                return info
+
+            info = get_video_info(video)
+            if cache is not None:
+                cache[video.name] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "info": {
+                        "duration": info.duration,
+                        "width": info.width,
+                        "height": info.height,
+                        "fps": info.fps,
+                        "has_audio": info.has_audio,
+                        "rotation": info.rotation,
+                    },
+                }
+            return info
+        except (ValidationError, ProcessingError, OSError) as e:
+            return e
+
+    # Probing waits on ffprobe/ffmpeg subprocesses, so threads overlap well
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(probe, videos))
 
 
 def select_video_interactive(input_folder: Path) -> Optional[Path]:
@@ -80,20 +159,27 @@ def select_video_interactive(input_folder: Path) -> Optional[Path]:
         print(f"❌ No video files found in: {input_folder}")
         return None
 
-    pages = paginate_list(videos, page_size=10)
+    total_pages = (len(videos) + PAGE_SIZE - 1) // PAGE_SIZE
+    cache = _load_cache(input_folder)
     current_page = 0
 
     while True:
         print(f"\n{'='*60}")
-        print(f"Videos in '{input_folder.name}' (Page {current_page + 1}/{len(pages)})")
+        print(f"Videos in '{input_folder.name}' (Page {current_page + 1}/{total_pages})")
         print(f"{'='*60}")
 
-        page_videos = pages[current_page]
-        for i, video in enumerate(page_videos, start=1):
-            idx = current_page * 10 + i
+        page_start = current_page * PAGE_SIZE
+        page_videos = videos[page_start : page_start + PAGE_SIZE]
+        cached = dict(cache)
+        page_infos = probe_videos(page_videos, cache)
+        if cache != cached:
+            _save_cache(input_folder, cache)
+        for i, (video, info) in enumerate(zip(page_videos, page_infos), start=1):
+            idx = page_start + i
             # Get video duration
             try:
-                info = get_video_info(video)
+                if isinstance(info, Exception):
+                    raise info
                 duration_str = f"{info.duration:.1f}s"
                 size_str = f"{video.stat().st_size / 1024 / 1024:.1f}MB"
                 print(f"[{idx:2d}] {video.name:<40} {duration_str:>8} {size_str:>10}")
@@ -101,7 +187,7 @@ def select_video_interactive(input_folder: Path) -> Optional[Path]:
                 print(f"[{idx:2d}] {video.name:<40} (error: {e})")
 
         print(f"\n{'='*60}")
-        if len(pages) > 1:
+        if total_pages > 1:
             print("[N] Next page  [P] Previous page  [Q] Quit")
         print("[1-10] Select video number  [Q] Quit")
         print(f"{'='*60}")
@@ -110,7 +196,7 @@ def select_video_interactive(input_folder: Path) -> Optional[Path]:
 
         if choice == "Q":
             return None
-        elif choice == "N" and current_page < len(pages) - 1:
+        elif choice == "N" and current_page < total_pages - 1:
             current_page += 1
         elif choice == "P" and current_page > 0:
             current_page -= 1
@@ -143,74 +229,75 @@ def get_conversion_options_interactive(video_info) -> ConversionOptions:
         return ConversionOptions()
 
     print(f"⚠️  Video is over 60 seconds ({video_info.duration:.1f}s)")
-    print("\nOptions:")
-    print("[1] Use speed adjustment (recommended)")
-    print("[2] Select specific segment")
-    print("[Q] Cancel")
-
-    choice = input("\nSelect option: ").strip().upper()
 
-    if choice == "Q":
-        sys.exit(0)
-    elif choice == "1":
-        # Speed mode
-        suggested_speed = video_info.duration / 59.0
-        print(f"\nSuggested speed: {suggested_speed:.2f}x")
-
-        while True:
-            speed_input = input(
-                f"Enter speed (1.0-4.0) or press Enter for {suggested_speed:.2f}x: "
-            ).strip()
+    while True:
+        print("\nOptions:")
+        print("[1] Use speed adjustment (recommended)")
+        print("[2] Select specific segment")
+        print("[Q] Cancel")
 
-            if not speed_input:
-                speed = suggested_speed
-                break
+        choice = input("\nSelect option: ").strip().upper()
 
-            try:
-                speed = float(speed_input)
-                if 0 < speed <= 4.0:
+        if choice == "Q":
+            sys.exit(0)
+        elif choice == "1":
+            # Speed mode
+            suggested_speed = video_info.suggested_speed
+            print(f"\nSuggested speed: {suggested_speed:.2f}x")
+
+            while True:
+                speed_input = input(
+                    f"Enter speed (1.0-4.0) or press Enter for {suggested_speed:.2f}x: "
+                ).strip()
+
+                if not speed_input:
+                    speed = suggested_speed
                     break
-                else:
-                    print("❌ Speed must be between 0 and 4.0")
-            except ValueError:
-                print("❌ Invalid number")
 
-        options = ConversionOptions(speed=speed)
-        output_duration = options.calculate_output_duration(video_info.duration)
-        print(f"✓ Output will be {output_duration:.1f} seconds")
+                try:
+                    speed = float(speed_input)
+                    if 0 < speed <= 4.0:
+                        break
+                    else:
+                        print("❌ Speed must be between 0 and 4.0")
+                except ValueError:
+                    print("❌ Invalid number")
 
-        return options
+            options = ConversionOptions(speed=speed)
+            output_duration = options.calculate_output_duration(video_info.duration)
+            print(f"✓ Output will be {output_duration:.1f} seconds")
 
-    elif choice == "2":
-        # Segment mode
-        print(f"\nVideo duration: {video_info.duration:.1f} seconds")
+            return options
 
-        while True:
-            try:
-                start = float(input("Start time (seconds): ").strip())
-                duration = float(input("Duration (seconds, max 60): ").strip())
+        elif choice == "2":
+            # Segment mode
+            print(f"\nVideo duration: {video_info.duration:.1f} seconds")
 
-                if start < 0 or start >= video_info.duration:
-                    print(f"❌ Start time must be between 0 and {video_info.duration:.1f}")
-                    continue
+            while True:
+                try:
+                    start = float(input("Start time (seconds): ").strip())
+                    duration = float(input("Duration (seconds, max 60): ").strip())
 
-                if duration <= 0 or duration > 60:
-                    print("❌ Duration must be between 0 and 60")
-                    continue
+                    if start < 0 or start >= video_info.duration:
+                        print(f"❌ Start time must be between 0 and {video_info.duration:.1f}")
+                        continue
 
-                if start + duration > video_info.duration:
-                    print("❌ Segment exceeds video length")
-                    continue
+                    if duration <= 0 or duration > 60:
+                        print("❌ Duration must be between 0 and 60")
+                        continue
 
-                options = ConversionOptions(start_time=start, duration=duration)
-                print(f"✓ Will extract {start:.1f}s - {start + duration:.1f}s")
-                return options
+                    if start + duration > video_info.duration:
+                        print("❌ Segment exceeds video length")
+                        continue
 
-            except ValueError:
-                print("❌ Invalid number")
-    else:
-        print("❌ Invalid option")
-        return get_conversion_options_interactive(video_info)
+                    options = ConversionOptions(start_time=start, duration=duration)
+                    print(f"✓ Will extract {start:.1f}s - {start + duration:.1f}s")
+                    return options
+
+                except ValueError:
+                    print("❌ Invalid number")
+        else:
+            print("❌ Invalid option")
 
 
 def progress_callback(progress: float):
@@ -323,7 +410,7 @@ Examples:
                 print("   → Video under 60s, converting as-is")
                 options = ConversionOptions()
             else:
-                speed = video_info.duration / 59.0
+                speed = video_info.suggested_speed
                 print(f"   → Video over 60s, using {speed:.2f}x speed")
                 options = ConversionOptions(speed=speed)
 
@@ -4,18 +4,82 @@ sh0rtifier - Core Logic (MVP)
 This module handles video conversion from 16:9 to 9:16 with 60-second limit.
 """
 
+import enum
+import functools
+import json
 import logging
-from dataclasses import dataclass
+import math
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from fractions import Fraction
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 
 import cv2
 import numpy as np
+from moviepy.config import get_setting
 from moviepy.editor import VideoFileClip, vfx
 
+try:
+    import av
+except ImportError:
+    av = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Make sure OpenCV's SIMD/IPP code paths are enabled, and give it half the
+# cores so its resize/blur/LUT threads leave the rest to the x264 encoder
+cv2.setUseOptimized(True)
+cv2.setNumThreads(max(1, (os.cpu_count() or 4) // 2))
+if hasattr(cv2, "setUseOpenVX"):
+    # OpenVX dispatch is slower than the native kernels on some builds
+    cv2.setUseOpenVX(False)
+
+# Background blurs with sigma >= this run on a 1/BLUR_DOWNSCALE_FACTOR-sized frame
+BLUR_DOWNSCALE_MIN_SIGMA = 10
+BLUR_DOWNSCALE_FACTOR = 8
+
+# Frames buffered between the decode, layout and encode threads of the PyAV engine
+PIPELINE_QUEUE_SIZE = 8
+
+# Containers using the ISO base media (MP4) box layout, probed without ffmpeg
+MP4_EXTENSIONS = {".mp4", ".mov", ".m4v"}
+
+# ffprobe codec names for common MP4 sample entry types
+MP4_CODEC_NAMES = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "mp4a": "aac",
+    "ac-3": "ac3",
+    "Opus": "opus",
+}
+
+# Hardware H.264 encoders tried by codec="auto", in order of preference
+HARDWARE_ENCODERS = ("h264_nvenc", "h264_videotoolbox", "h264_qsv")
+
+# Encoder-specific quality settings passed to ffmpeg
+ENCODER_ARGS = {
+    "libx264": ["-preset", "medium"],
+    "h264_nvenc": ["-preset", "p5", "-tune", "hq", "-rc", "vbr"],
+    "h264_qsv": ["-preset", "medium"],
+}
+
 
 class ShortsError(Exception):
     """Base exception for Shorts Maker"""
@@ -35,7 +99,30 @@ class ProcessingError(ShortsError):
     pass
 
 
-@dataclass
+class ValidationCode(enum.IntEnum):
+    """Outcome of ConversionOptions.check"""
+
+    OK = 0
+    EXCEEDS_60S = 1
+    NEGATIVE_START = 2
+    START_EXCEEDS_DURATION = 3
+    SEGMENT_EXCEEDS = 4
+    INVALID_SPEED = 5
+    NEGATIVE_DURATION = 6
+
+
+# User-facing text for each failed check, formatted by ConversionOptions.validate
+VALIDATION_MESSAGES = {
+    ValidationCode.EXCEEDS_60S: "Output duration ({output_duration:.1f}s) exceeds 60 seconds limit",
+    ValidationCode.NEGATIVE_START: "Start time must be 0 or greater",
+    ValidationCode.START_EXCEEDS_DURATION: "Start time exceeds video duration ({video_duration:.1f}s)",
+    ValidationCode.SEGMENT_EXCEEDS: "Selected segment exceeds video duration",
+    ValidationCode.INVALID_SPEED: "Speed must be greater than 0",
+    ValidationCode.NEGATIVE_DURATION: "Duration must be greater than 0",
+}
+
+
+@dataclass(frozen=True)
 class VideoInfo:
     """Video file information"""
 
@@ -45,6 +132,11 @@ class VideoInfo:
     height: int
     fps: float
     has_audio: bool
+    # Clockwise degrees (0, 90, 180 or 270) the stored frames are turned for display
+    rotation: int = 0
+    # ffprobe-style JSON (streams and format), for callers needing more fields
+    # such as codec_name or bit_rate; the MP4 box reader fills the same keys
+    raw: dict = field(default_factory=dict, repr=False, compare=False)
 
     @property
     def is_short(self) -> bool:
@@ -61,8 +153,29 @@ class VideoInfo:
         """Check if video is landscape (16:9-ish)"""
         return self.width > self.height
 
+    @property
+    def suggested_speed(self) -> float:
+        """Speed that fits the whole video into 59 seconds (1s margin under the limit)"""
+        return self.duration / 59.0
+
+
+def make_brightness_lut(brightness: float, darken: int) -> np.ndarray:
+    """
+    Build a 256-entry lookup table for the background brightness pass
 
-@dataclass
+    Args:
+        brightness: Brightness multiplier
+        darken: Brightness offset
+
+    Returns:
+        uint8 array mapping each pixel value to clip(brightness * x + darken)
+    """
+    levels = np.arange(256, dtype=np.float32) * brightness + darken
+    lut: np.ndarray = np.clip(np.rint(levels), 0, 255).astype(np.uint8)
+    return lut
+
+
+@dataclass(frozen=True)
 class ConversionOptions:
     """Options for video conversion"""
 
@@ -78,6 +191,7 @@ class ConversionOptions:
     target_height: int = 1920
     output_bitrate: str = "8000k"
     output_fps: int = 30
+    codec: str = "auto"  # "auto" picks a working hardware encoder, else libx264
 
     # Visual effects
     blur_kernel: int = 99
@@ -88,6 +202,25 @@ class ConversionOptions:
     video_fadeout: float = 1.0
     audio_fadeout: float = 3.0
 
+    # Processing engine: "ffmpeg" (native filtergraph), "pyav" (in-process libavfilter graph)
+    # or "moviepy" (per-frame OpenCV)
+    engine: str = "ffmpeg"
+
+    # Render per-frame layouts with the Numba fused kernel (needs numba)
+    fused_layout: bool = False
+
+    # Derived from the visual effect settings in __post_init__
+    blur_ksize: int = field(init=False, repr=False, compare=False)
+    brightness_lut: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Frozen, so derived fields are set through object.__setattr__.
+        # Gaussian kernels must be odd.
+        object.__setattr__(self, "blur_ksize", self.blur_kernel | 1)
+        object.__setattr__(
+            self, "brightness_lut", make_brightness_lut(self.blur_brightness, self.blur_darken)
+        )
+
     def calculate_output_duration(self, original_duration: float) -> float:
         """
         Calculate the final output duration
@@ -108,6 +241,45 @@ class ConversionOptions:
         # Apply speed
         return actual_duration / self.speed
 
+    def check(self, video_info: VideoInfo) -> ValidationCode:
+        """
+        Check conversion options against a video
+
+        Args:
+            video_info: Video information
+
+        Returns:
+            ValidationCode.OK, or the code of the first problem found
+        """
+        # Speed applies to every video, so a non-positive one is never OK
+        if self.speed <= 0:
+            return ValidationCode.INVALID_SPEED
+
+        # Other videos under 60 seconds are always OK
+        if video_info.is_short:
+            return ValidationCode.OK
+
+        # For videos over 60 seconds: sign checks on the options alone come
+        # first, then checks against the video, then the derived output length
+        if self.start_time < 0:
+            return ValidationCode.NEGATIVE_START
+
+        if self.duration is not None and self.duration <= 0:
+            return ValidationCode.NEGATIVE_DURATION
+
+        if self.start_time >= video_info.duration:
+            return ValidationCode.START_EXCEEDS_DURATION
+
+        # Check segment duration if specified
+        if self.duration is not None and self.start_time + self.duration > video_info.duration:
+            return ValidationCode.SEGMENT_EXCEEDS
+
+        # Check final output duration
+        if self.calculate_output_duration(video_info.duration) > 60.0:
+            return ValidationCode.EXCEEDS_60S
+
+        return ValidationCode.OK
+
     def validate(self, video_info: VideoInfo) -> tuple[bool, Optional[str]]:
         """
         Validate conversion options
@@ -118,40 +290,282 @@ class ConversionOptions:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        # Videos under 60 seconds are always OK
-        if video_info.is_short:
+        code = self.check(video_info)
+        if code is ValidationCode.OK:
             return True, None
 
-        # For videos over 60 seconds
-        if self.start_time < 0:
-            return False, "Start time must be 0 or greater"
+        output_duration = 0.0
+        if code is ValidationCode.EXCEEDS_60S:
+            output_duration = self.calculate_output_duration(video_info.duration)
+        message = VALIDATION_MESSAGES[code].format(
+            video_duration=video_info.duration, output_duration=output_duration
+        )
+        return False, message
+
+
+def _run_ffprobe(ffprobe: str, video_path: Path) -> dict:
+    """Run ffprobe once for all streams and the container, returning the parsed JSON"""
+    result = subprocess.run(
+        [
+            ffprobe,
+            "-v",
+            "error",
+            "-show_format",
+            "-show_streams",
+            "-of",
+            "json",
+            str(video_path),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data: dict = json.loads(result.stdout)
+    return data
+
+
+def _ffprobe_rotation(stream: dict) -> int:
+    """Clockwise display rotation from a stream's display matrix side data or legacy rotate tag"""
+    for side_data in stream.get("side_data_list", []):
+        if "rotation" in side_data:
+            # Display matrix side data is reported counterclockwise
+            return round(-float(side_data["rotation"])) % 360
+    return int(stream.get("tags", {}).get("rotate", 0)) % 360
+
+
+def _video_info_from_ffprobe(video_path: Path, data: dict) -> VideoInfo:
+    """Build a VideoInfo from ffprobe's JSON output"""
+    streams = data.get("streams", [])
+    stream = next(s for s in streams if s.get("codec_type") == "video")
+    duration = stream.get("duration") or data["format"]["duration"]
+    width, height = int(stream["width"]), int(stream["height"])
+    rotation = _ffprobe_rotation(stream)
+    if rotation % 180 == 90:
+        # Report the displayed size, as the MP4 box reader does
+        width, height = height, width
+    return VideoInfo(
+        path=video_path,
+        duration=float(duration),
+        width=width,
+        height=height,
+        fps=float(Fraction(stream["r_frame_rate"])),
+        has_audio=any(s.get("codec_type") == "audio" for s in streams),
+        rotation=rotation,
+        raw=data,
+    )
 
-        if self.start_time >= video_info.duration:
-            return False, f"Start time exceeds video duration ({video_info.duration:.1f}s)"
 
-        if self.speed <= 0:
-            return False, "Speed must be greater than 0"
+def _probe_with_ffprobe(ffprobe: str, video_path: Path) -> VideoInfo:
+    """Read container metadata with ffprobe (no decoder initialization)"""
+    return _video_info_from_ffprobe(video_path, _run_ffprobe(ffprobe, video_path))
 
-        # Check segment duration if specified
-        if self.duration is not None:
-            if self.duration <= 0:
-                return False, "Duration must be greater than 0"
 
-            if self.start_time + self.duration > video_info.duration:
-                return False, "Selected segment exceeds video duration"
+def _probe_with_moviepy(video_path: Path) -> VideoInfo:
+    """Read video metadata by opening the clip with MoviePy"""
+    clip = VideoFileClip(str(video_path))
+    info = VideoInfo(
+        path=video_path,
+        duration=clip.duration,
+        width=clip.w,
+        height=clip.h,
+        fps=clip.fps,
+        has_audio=clip.audio is not None,
+        # MoviePy reads the legacy rotate tag, which is clockwise
+        rotation=clip.rotation % 360,
+    )
+    clip.close()
+    return info
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """Yield (type, payload_start, payload_end) for each MP4 box in data[start:end]"""
+    end = len(data) if end is None else end
+    while start + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, start)
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, start + 8)
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header or start + size > end:
+            raise ValueError(f"Malformed MP4 box {box_type!r}")
+        yield box_type, start + header, start + size
+        start += size
+
+
+def _read_moov(video_path: Path) -> bytes:
+    """Seek past top-level boxes (skipping mdat) and return the moov payload"""
+    with open(video_path, "rb") as f:
+        file_size = f.seek(0, 2)
+        offset = 0
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            header = f.read(16)
+            size, box_type = struct.unpack_from(">I4s", header)
+            header_size = 8
+            if size == 1:
+                (size,) = struct.unpack_from(">Q", header, 8)
+                header_size = 16
+            elif size == 0:
+                size = file_size - offset
+            if size < header_size:
+                break
+            if box_type == b"moov":
+                f.seek(offset + header_size)
+                return f.read(size - header_size)
+            offset += size
+    raise ValueError("No moov box found")
+
+
+def _parse_mp4_track(data: bytes, start: int, end: int) -> dict:
+    """Extract handler type, display size, timescale, duration and sample timing of a trak"""
+    track: dict = {}
+    for box_type, s, e in _iter_boxes(data, start, end):
+        if box_type == b"tkhd":
+            version = data[s]
+            matrix = s + (52 if version == 1 else 40)
+            a, b = struct.unpack_from(">ii", data, matrix)
+            rotation = round(math.degrees(math.atan2(b, a))) % 360
+            width, height = struct.unpack_from(">II", data, matrix + 36)
+            width, height = width >> 16, height >> 16
+            track["coded_size"] = (width, height)
+            track["rotation"] = rotation
+            track["size"] = (height, width) if rotation % 180 == 90 else (width, height)
+        elif box_type == b"mdia":
+            for mdia_type, ms, me in _iter_boxes(data, s, e):
+                if mdia_type == b"mdhd":
+                    if data[ms] == 1:
+                        timescale, duration = struct.unpack_from(">IQ", data, ms + 20)
+                    else:
+                        timescale, duration = struct.unpack_from(">II", data, ms + 12)
+                    track["timescale"], track["duration"] = timescale, duration
+                elif mdia_type == b"hdlr":
+                    track["handler"] = data[ms + 8 : ms + 12]
+                elif mdia_type == b"minf":
+                    track.update(_parse_mp4_sample_table(data, ms, me))
+    return track
+
+
+def _parse_mp4_sample_table(data: bytes, start: int, end: int) -> dict:
+    """Read the codec type (stsd) and sum the time-to-sample (stts) table of a minf box"""
+    table: dict = {}
+    for box_type, s, e in _iter_boxes(data, start, end):
+        if box_type == b"stbl":
+            for stbl_type, ss, _ in _iter_boxes(data, s, e):
+                if stbl_type == b"stsd":
+                    # Type of the first sample entry, after version/flags, count and size
+                    table["codec_tag"] = data[ss + 12 : ss + 16].decode("latin-1")
+                elif stbl_type == b"stts":
+                    (entries,) = struct.unpack_from(">I", data, ss + 4)
+                    samples = ticks = 0
+                    for i in range(entries):
+                        count, delta = struct.unpack_from(">II", data, ss + 8 + 8 * i)
+                        samples += count
+                        ticks += count * delta
+                    table["samples"], table["sample_ticks"] = samples, ticks
+    return table
+
+
+def _mp4_raw_info(tracks: list[dict], file_size: int, duration: float) -> dict:
+    """Describe parsed MP4 tracks with the ffprobe JSON keys kept in VideoInfo.raw"""
+    streams: list[dict] = []
+    for track in tracks:
+        codec_type = {b"vide": "video", b"soun": "audio"}.get(track.get("handler"))
+        if codec_type is None:
+            continue
+        stream: dict = {"index": len(streams), "codec_type": codec_type}
+        if "codec_tag" in track:
+            tag = track["codec_tag"]
+            stream["codec_name"] = MP4_CODEC_NAMES.get(tag, tag)
+            stream["codec_tag_string"] = tag
+        if codec_type == "video":
+            # Like ffprobe, report the stored size before any rotation
+            stream["width"], stream["height"] = track["coded_size"]
+        if track.get("timescale"):
+            stream["duration"] = f"{track['duration'] / track['timescale']:.6f}"
+        streams.append(stream)
+    return {
+        "streams": streams,
+        "format": {
+            "duration": f"{duration:.6f}",
+            "size": str(file_size),
+            "bit_rate": str(int(file_size * 8 / duration)) if duration > 0 else "0",
+        },
+    }
+
+
+def _fast_probe_mp4(video_path: Path) -> Optional[VideoInfo]:
+    """
+    Read video metadata straight from the MP4 moov box
 
-        # Check final output duration
-        output_duration = self.calculate_output_duration(video_info.duration)
-        if output_duration > 60.0:
-            return False, f"Output duration ({output_duration:.1f}s) exceeds 60 seconds limit"
+    Only the box headers up to moov and the moov box itself are read, so
+    no subprocess or decoder is started.
+
+    Args:
+        video_path: Path to an MP4/MOV file
+
+    Returns:
+        VideoInfo, or None if the file could not be parsed
+    """
+    try:
+        moov = _read_moov(video_path)
+        tracks = [
+            _parse_mp4_track(moov, s, e)
+            for box_type, s, e in _iter_boxes(moov)
+            if box_type == b"trak"
+        ]
+        video = next(t for t in tracks if t.get("handler") == b"vide")
+        width, height = video["size"]
+        timescale = video["timescale"]
+        duration = video["duration"] / timescale
+        return VideoInfo(
+            path=video_path,
+            duration=duration,
+            width=width,
+            height=height,
+            fps=video["samples"] * timescale / video["sample_ticks"],
+            has_audio=any(t.get("handler") == b"soun" for t in tracks),
+            rotation=video.get("rotation", 0),
+            raw=_mp4_raw_info(tracks, os.path.getsize(video_path), duration),
+        )
+    except (
+        OSError,
+        ValueError,
+        KeyError,
+        IndexError,
+        StopIteration,
+        struct.error,
+        ZeroDivisionError,
+    ):
+        return None
+
+
+@functools.lru_cache(maxsize=512)
+def _probe_cached(path_str: str, size: int, mtime_ns: int) -> VideoInfo:
+    """
+    Probe a video file, memoized by (path, size, mtime)
+
+    size and mtime_ns are only part of the cache key so that a modified
+    file is probed again.
+    """
+    if Path(path_str).suffix.lower() in MP4_EXTENSIONS:
+        info = _fast_probe_mp4(Path(path_str))
+        if info is not None:
+            return info
 
-        return True, None
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        return _probe_with_ffprobe(ffprobe, Path(path_str))
+    return _probe_with_moviepy(Path(path_str))
 
 
 def get_video_info(video_path: Path) -> VideoInfo:
     """
     Extract video information
 
+    Results are cached per file and reused until the file changes.
+
     Args:
         video_path: Path to video file
 
@@ -162,19 +576,29 @@ def get_video_info(video_path: Path) -> VideoInfo:
         ProcessingError: If video cannot be read
     """
     try:
-        clip = VideoFileClip(str(video_path))
-        info = VideoInfo(
-            path=video_path,
-            duration=clip.duration,
-            width=clip.w,
-            height=clip.h,
-            fps=clip.fps,
-            has_audio=clip.audio is not None,
-        )
-        clip.close()
-        return info
-    except (OSError, RuntimeError) as e:
+        stat = video_path.stat()
+        return _probe_cached(str(video_path), stat.st_size, stat.st_mtime_ns)
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
         raise ProcessingError(f"Failed to read video info: {str(e)}") from e
+    except (KeyError, IndexError, StopIteration, ValueError, ZeroDivisionError) as e:
+        raise ProcessingError(f"Failed to parse video info: {str(e)}") from e
+
+
+def _blur_downscaled(
+    frame: np.ndarray, target_width: int, target_height: int, kernel_size: int, blur_sigma: int
+) -> np.ndarray:
+    """
+    Blur the stretched background at 1/BLUR_DOWNSCALE_FACTOR of the target size
+
+    A blur this wide looks the same when done at 1/8 size and upscaled,
+    so blur 1/64 of the pixels with a proportionally smaller kernel.
+    """
+    factor = BLUR_DOWNSCALE_FACTOR
+    small_size = (max(1, target_width // factor), max(1, target_height // factor))
+    small = cv2.resize(frame, small_size, interpolation=cv2.INTER_AREA)
+    small_kernel = (kernel_size // factor) | 1
+    cv2.GaussianBlur(small, (small_kernel, small_kernel), blur_sigma / factor, dst=small)
+    return small
 
 
 def create_blur_background(
@@ -185,6 +609,7 @@ def create_blur_background(
     blur_sigma: int,
     brightness: float,
     darken: int,
+    lut: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Create blurred background for vertical video
@@ -197,20 +622,28 @@ def create_blur_background(
         blur_sigma: Gaussian blur sigma
         brightness: Brightness multiplier
         darken: Brightness offset
+        lut: Precomputed brightness lookup table (built from brightness/darken if None)
 
     Returns:
         Blurred background frame
     """
-    # Resize to target size (stretched)
-    bg = cv2.resize(frame, (target_width, target_height))
+    kernel_size = blur_kernel | 1
 
-    # Apply Gaussian blur
-    if blur_kernel > 0:
-        kernel_size = blur_kernel if blur_kernel % 2 == 1 else blur_kernel + 1
-        bg = cv2.GaussianBlur(bg, (kernel_size, kernel_size), blur_sigma)
+    if blur_kernel > 0 and blur_sigma >= BLUR_DOWNSCALE_MIN_SIGMA:
+        small = _blur_downscaled(frame, target_width, target_height, kernel_size, blur_sigma)
+        bg = cv2.resize(small, (target_width, target_height), interpolation=cv2.INTER_LINEAR)
+    else:
+        # Resize to target size (stretched)
+        bg = cv2.resize(frame, (target_width, target_height))
+
+        # Apply Gaussian blur (in place)
+        if blur_kernel > 0:
+            cv2.GaussianBlur(bg, (kernel_size, kernel_size), blur_sigma, dst=bg)
 
-    # Adjust brightness
-    bg = cv2.convertScaleAbs(bg, alpha=brightness, beta=darken)
+    # Adjust brightness (in place)
+    if lut is None:
+        lut = make_brightness_lut(brightness, darken)
+    cv2.LUT(bg, lut, dst=bg)
 
     return bg
 
@@ -223,6 +656,8 @@ def apply_vertical_layout(
     blur_sigma: int,
     brightness: float,
     darken: int,
+    lut: Optional[np.ndarray] = None,
+    bg_cache: Optional[dict] = None,
 ) -> np.ndarray:
     """
     Apply 9:16 vertical layout with blurred background
@@ -235,35 +670,905 @@ def apply_vertical_layout(
         blur_sigma: Blur sigma
         brightness: Background brightness
         darken: Background darken amount
+        lut: Precomputed background brightness lookup table
+        bg_cache: Dict kept between frames to reuse the background of unchanged shots
 
     Returns:
         Processed frame in 9:16 format
     """
     h, w = frame.shape[:2]
 
-    # Create blurred background
-    result = create_blur_background(
-        frame, target_width, target_height, blur_kernel, blur_sigma, brightness, darken
-    )
-
     # Resize main video (fit width, maintain aspect ratio)
     scale = target_width / w
     new_width = target_width
     new_height = int(h * scale)
-    resized = cv2.resize(frame, (new_width, new_height))
 
-    # Center vertically
-    if new_height <= target_height:
-        y_offset = (target_height - new_height) // 2
-        result[y_offset : y_offset + new_height, 0:target_width] = resized
-    else:
-        # If taller than target, crop from center
+    if new_height >= target_height:
+        # Foreground covers the whole frame: crop from center, no background needed
+        resized = cv2.resize(frame, (new_width, new_height))
         crop_y = (new_height - target_height) // 2
-        result[:, :] = resized[crop_y : crop_y + target_height, :]
+        cropped: np.ndarray = resized[crop_y : crop_y + target_height]
+        return cropped
+
+    if max(h, w) <= target_width // 2:
+        # Low-res source has no detail to lose: lay out at half size, upscale once.
+        # The half-size pass skips this check, so smaller sources are not halved again.
+        half = _layout_over_background(
+            frame,
+            target_width // 2,
+            target_height // 2,
+            blur_kernel // 2,
+            blur_sigma // 2,
+            brightness,
+            darken,
+            lut,
+            bg_cache,
+        )
+        upscaled: np.ndarray = cv2.resize(
+            half, (target_width, target_height), interpolation=cv2.INTER_LINEAR
+        )
+        return upscaled
+
+    return _layout_over_background(
+        frame,
+        target_width,
+        target_height,
+        blur_kernel,
+        blur_sigma,
+        brightness,
+        darken,
+        lut,
+        bg_cache,
+    )
+
+
+def _layout_over_background(
+    frame: np.ndarray,
+    target_width: int,
+    target_height: int,
+    blur_kernel: int,
+    blur_sigma: int,
+    brightness: float,
+    darken: int,
+    lut: Optional[np.ndarray],
+    bg_cache: Optional[dict],
+) -> np.ndarray:
+    """Center the width-fitted frame over its blurred background (frame shorter than 9:16)"""
+    h, w = frame.shape[:2]
+    new_height = int(h * target_width / w)
+
+    # Create blurred background
+    if bg_cache is not None:
+        # Reuse the previous background while the frame thumbnail is unchanged
+        key = cv2.resize(frame, (16, 9), interpolation=cv2.INTER_AREA).tobytes()
+        if bg_cache.get("key") != key:
+            bg_cache["key"] = key
+            bg_cache["background"] = create_blur_background(
+                frame, target_width, target_height, blur_kernel, blur_sigma, brightness, darken, lut
+            )
+        result: np.ndarray = bg_cache["background"].copy()
+    else:
+        result = create_blur_background(
+            frame, target_width, target_height, blur_kernel, blur_sigma, brightness, darken, lut
+        )
+
+    # Center vertically, resizing straight into the destination rows
+    y_offset = (target_height - new_height) // 2
+    cv2.resize(frame, (target_width, new_height), dst=result[y_offset : y_offset + new_height])
 
     return result
 
 
+def _linear_taps(dst_size: int, src_size: int):
+    """Source indices and weights for bilinear resampling (cv2.INTER_LINEAR mapping)"""
+    scale = src_size / dst_size
+    lo = np.empty(dst_size, np.int64)
+    hi = np.empty(dst_size, np.int64)
+    weight = np.empty(dst_size, np.float32)
+    for i in range(dst_size):
+        pos = max((i + 0.5) * scale - 0.5, 0.0)
+        j = int(pos)
+        if j >= src_size - 1:
+            lo[i] = hi[i] = src_size - 1
+            weight[i] = 0.0
+        else:
+            lo[i] = j
+            hi[i] = j + 1
+            weight[i] = pos - j
+    return lo, hi, weight
+
+
+def _compose_vertical_layout(frame, small_bg, lut, out, y_offset, fg_height):
+    """
+    Fused upscale + brightness LUT + foreground resize + composite
+
+    Every output row is written exactly once: rows inside the foreground band
+    are resampled from the frame, the rest from the small blurred background.
+    """
+    target_height, target_width = out.shape[0], out.shape[1]
+    bg_x0, bg_x1, bg_wx = _linear_taps(target_width, small_bg.shape[1])
+    bg_y0, bg_y1, bg_wy = _linear_taps(target_height, small_bg.shape[0])
+    fg_x0, fg_x1, fg_wx = _linear_taps(target_width, frame.shape[1])
+    fg_y0, fg_y1, fg_wy = _linear_taps(fg_height, frame.shape[0])
+
+    for y in _prange(target_height):
+        row = y - y_offset
+        if 0 <= row < fg_height:
+            a, b, wy = fg_y0[row], fg_y1[row], fg_wy[row]
+            for x in range(target_width):
+                c, d, wx = fg_x0[x], fg_x1[x], fg_wx[x]
+                for ch in range(3):
+                    top = frame[a, c, ch] * (1.0 - wx) + frame[a, d, ch] * wx
+                    bottom = frame[b, c, ch] * (1.0 - wx) + frame[b, d, ch] * wx
+                    out[y, x, ch] = int(top * (1.0 - wy) + bottom * wy + 0.5)
+        else:
+            a, b, wy = bg_y0[y], bg_y1[y], bg_wy[y]
+            for x in range(target_width):
+                c, d, wx = bg_x0[x], bg_x1[x], bg_wx[x]
+                for ch in range(3):
+                    top = small_bg[a, c, ch] * (1.0 - wx) + small_bg[a, d, ch] * wx
+                    bottom = small_bg[b, c, ch] * (1.0 - wx) + small_bg[b, d, ch] * wx
+                    out[y, x, ch] = lut[int(top * (1.0 - wy) + bottom * wy + 0.5)]
+    return out
+
+
+_prange: Callable[..., Any] = range if numba is None else numba.prange
+
+if numba is not None:
+    _linear_taps = numba.njit(cache=True)(_linear_taps)
+    _compose_vertical_layout = numba.njit(parallel=True, fastmath=True, cache=True)(
+        _compose_vertical_layout
+    )
+
+
+def can_use_fused_layout(options: ConversionOptions) -> bool:
+    """Check if the Numba fused layout kernel is requested and can render these options"""
+    return (
+        options.fused_layout
+        and numba is not None
+        and options.blur_kernel > 0
+        and options.blur_sigma >= BLUR_DOWNSCALE_MIN_SIGMA
+    )
+
+
+def apply_vertical_layout_fused(
+    frame: np.ndarray, out: np.ndarray, options: ConversionOptions
+) -> np.ndarray:
+    """
+    Apply 9:16 vertical layout with a single Numba kernel
+
+    Same result as apply_vertical_layout for large-sigma blurs, but the
+    background upscale, brightness pass, foreground resize and composite
+    run as one parallel pass that writes into a reusable output buffer.
+
+    Args:
+        frame: Input frame (RGB, uint8)
+        out: Output buffer of shape (target_height, target_width, 3), uint8
+        options: Conversion options (see can_use_fused_layout)
+
+    Returns:
+        The filled output buffer
+    """
+    h, w = frame.shape[:2]
+    target_height, target_width = out.shape[:2]
+    fg_height = int(h * target_width / w)
+    if fg_height >= target_height:
+        # Foreground covers every row, so the background is never sampled.
+        # Negate the crop offset rather than floor the negative difference,
+        # so odd differences crop the same row as apply_vertical_layout.
+        y_offset = -((fg_height - target_height) // 2)
+        small_bg = np.zeros((1, 1, 3), np.uint8)
+    else:
+        y_offset = (target_height - fg_height) // 2
+        small_bg = _blur_downscaled(
+            frame, target_width, target_height, options.blur_ksize, options.blur_sigma
+        )
+    _compose_vertical_layout(frame, small_bg, options.brightness_lut, out, y_offset, fg_height)
+    return out
+
+
+def cuda_available() -> bool:
+    """Check for an OpenCV build with CUDA filters and a usable GPU"""
+    try:
+        return (
+            hasattr(cv2, "cuda")
+            and hasattr(cv2.cuda, "createGaussianFilter")
+            and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        )
+    except cv2.error:
+        return False
+
+
+def _make_cuda_frame_processor(options: ConversionOptions) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Create a per-frame layout function that runs on the GPU via cv2.cuda
+
+    Device buffers, the blur filter and the brightness LUT are created once
+    and reused for every frame; only the finished frame is downloaded.
+    """
+    # The cv2 type stubs do not cover the CUDA modules
+    cuda: Any = cv2.cuda
+    tw, th = options.target_width, options.target_height
+    factor = BLUR_DOWNSCALE_FACTOR
+    small_size = (max(1, tw // factor), max(1, th // factor))
+    # CUDA separable filters support at most 32 taps
+    small_kernel = min((options.blur_ksize // factor) | 1, 31)
+
+    stream = cuda.Stream()
+    # CUDA Gaussian filters do not take 3-channel images, so blur in RGBA
+    gauss = cuda.createGaussianFilter(
+        cv2.CV_8UC4, cv2.CV_8UC4, (small_kernel, small_kernel), options.blur_sigma / factor
+    )
+    lut = cuda.createLookUpTable(options.brightness_lut.reshape(1, 256))
+
+    gpu_in = cuda.GpuMat()
+    gpu_small = cuda.GpuMat()
+    gpu_small_rgba = cuda.GpuMat()
+    gpu_blur_rgba = cuda.GpuMat()
+    gpu_fg = cuda.GpuMat()
+    gpu_result = cuda.GpuMat(th, tw, cv2.CV_8UC3)
+    host_out = np.empty((th, tw, 3), np.uint8)
+
+    def frame_processor(frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        fg_height = int(h * tw / w)
+        gpu_in.upload(frame, stream)
+
+        if fg_height <= th:
+            # Blurred, darkened background at 1/8 size, then upscaled
+            cuda.resize(gpu_in, small_size, gpu_small, interpolation=cv2.INTER_AREA, stream=stream)
+            cuda.cvtColor(gpu_small, cv2.COLOR_RGB2RGBA, gpu_small_rgba, stream=stream)
+            gauss.apply(gpu_small_rgba, gpu_blur_rgba, stream)
+            cuda.cvtColor(gpu_blur_rgba, cv2.COLOR_RGBA2RGB, gpu_small, stream=stream)
+            cuda.resize(
+                gpu_small, (tw, th), gpu_result, interpolation=cv2.INTER_LINEAR, stream=stream
+            )
+            lut.transform(gpu_result, gpu_result, stream)
+
+            # Foreground resized straight into its rows of the result
+            y_offset = (th - fg_height) // 2
+            roi = cuda.GpuMat(gpu_result, (0, y_offset, tw, fg_height))
+            cuda.resize(gpu_in, (tw, fg_height), roi, stream=stream)
+            gpu_result.download(stream, host_out)
+        else:
+            # Foreground covers the whole frame: crop from center
+            cuda.resize(gpu_in, (tw, fg_height), gpu_fg, stream=stream)
+            crop_y = (fg_height - th) // 2
+            cuda.GpuMat(gpu_fg, (0, crop_y, tw, th)).download(stream, host_out)
+
+        stream.waitForCompletion()
+        return host_out
+
+    return frame_processor
+
+
+def make_frame_processor(options: ConversionOptions) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Create the per-frame layout function for the MoviePy engine
+
+    Uses the Numba kernel when requested, otherwise the GPU when OpenCV
+    was built with CUDA, otherwise the OpenCV CPU functions. The returned
+    function keeps its buffers between calls, so use one per conversion and
+    consume each returned frame before passing the next one.
+
+    Args:
+        options: Conversion options
+
+    Returns:
+        Function mapping an RGB frame to the 9:16 output frame
+    """
+    use_fused = can_use_fused_layout(options)
+    if (
+        not use_fused
+        and options.blur_kernel > 0
+        and options.blur_sigma >= BLUR_DOWNSCALE_MIN_SIGMA
+        and cuda_available()
+    ):
+        logger.info("Using CUDA for the 9:16 layout")
+        return _make_cuda_frame_processor(options)
+
+    if use_fused:
+        fused_out = np.empty((options.target_height, options.target_width, 3), np.uint8)
+        return functools.partial(apply_vertical_layout_fused, out=fused_out, options=options)
+
+    # Bind every per-conversion constant once so each frame is a single call
+    return functools.partial(
+        apply_vertical_layout,
+        target_width=options.target_width,
+        target_height=options.target_height,
+        blur_kernel=options.blur_kernel,
+        blur_sigma=options.blur_sigma,
+        brightness=options.blur_brightness,
+        darken=options.blur_darken,
+        lut=options.brightness_lut,
+        bg_cache={},
+    )
+
+
+def parse_bitrate(bitrate: str) -> int:
+    """
+    Parse an ffmpeg-style bitrate string
+
+    Args:
+        bitrate: Bitrate such as "8000k", "8M" or "8000000"
+
+    Returns:
+        Bitrate in bits per second
+    """
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    suffix = bitrate[-1:].lower()
+    if suffix in multipliers:
+        return int(float(bitrate[:-1]) * multipliers[suffix])
+    return int(bitrate)
+
+
+ENGINES = ("ffmpeg", "pyav", "moviepy")
+
+
+def resolve_segment(video_info: VideoInfo, options: ConversionOptions) -> tuple[float, float]:
+    """
+    Resolve the source segment that will be converted
+
+    Segment selection only applies to videos over 60 seconds.
+
+    Args:
+        video_info: Video information
+        options: Conversion options
+
+    Returns:
+        Tuple of (start_time, length) in seconds
+    """
+    if video_info.is_short:
+        return 0.0, video_info.duration
+
+    if options.duration is not None:
+        end_time = min(options.start_time + options.duration, video_info.duration)
+    else:
+        end_time = video_info.duration
+
+    return options.start_time, end_time - options.start_time
+
+
+def atempo_factors(speed: float) -> list[float]:
+    """
+    Split a speed multiplier into atempo stages
+
+    atempo only accepts tempos between 0.5 and 2.0 per instance, so larger
+    changes are chained.
+
+    Args:
+        speed: Speed multiplier (> 0)
+
+    Returns:
+        Tempo factors, each within [0.5, 2.0], whose product is speed
+
+    Raises:
+        ValueError: If speed is not greater than 0
+    """
+    if speed <= 0:
+        raise ValueError(f"Speed must be greater than 0, got {speed}")
+
+    factors = []
+    while speed > 2.0:
+        factors.append(2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        factors.append(0.5)
+        speed /= 0.5
+    factors.append(speed)
+    return factors
+
+
+def build_filter_complex(
+    video_info: VideoInfo, options: ConversionOptions, output_duration: float
+) -> str:
+    """
+    Build the ffmpeg filtergraph for the 9:16 layout
+
+    The graph mirrors apply_vertical_layout: a stretched, blurred and darkened
+    background with the width-fitted foreground centered on top.
+
+    Args:
+        video_info: Video information
+        options: Conversion options
+        output_duration: Final output duration in seconds (after speed)
+
+    Returns:
+        Filtergraph string for -filter_complex
+    """
+    bg_filters, fg_filters, y_offset = _layout_filters(video_info, options)
+
+    video_chain = [f"overlay=0:{y_offset}", "setsar=1"]
+    if options.speed != 1.0:
+        video_chain.append(f"setpts=PTS/{options.speed}")
+    video_chain += _fade_filters(options, output_duration)
+
+    graph = [
+        "[0:v]split=2[bg][fg]",
+        f"[bg]{','.join(bg_filters)}[b]",
+        f"[fg]{','.join(fg_filters)}[f]",
+        f"[b][f]{','.join(video_chain)}[v]",
+    ]
+
+    if video_info.has_audio:
+        audio_chain = []
+        if options.speed != 1.0:
+            audio_chain += [f"atempo={f}" for f in atempo_factors(options.speed)]
+        if options.audio_fadeout > 0:
+            fade_start = max(0.0, output_duration - options.audio_fadeout)
+            audio_chain.append(f"afade=t=out:st={fade_start:.3f}:d={options.audio_fadeout}")
+        graph.append(f"[0:a]{','.join(audio_chain) or 'anull'}[a]")
+
+    return ";".join(graph)
+
+
+def _layout_filters(
+    video_info: VideoInfo, options: ConversionOptions
+) -> tuple[list[str], list[str], int]:
+    """Background and foreground filter chains of the 9:16 layout, plus the overlay y offset"""
+    tw, th = options.target_width, options.target_height
+
+    # Background: stretch, blur, then clip(val*brightness+darken), as in brightness_lut
+    bg_filters = [f"scale={tw}:{th}"]
+    if options.blur_kernel > 0:
+        bg_filters.append(f"gblur=sigma={options.blur_sigma}")
+    level = f"'clip(val*{options.blur_brightness}+({options.blur_darken}),0,255)'"
+    bg_filters.append(f"lutrgb=r={level}:g={level}:b={level}")
+
+    # Foreground: fit width, crop from center if taller than target
+    fg_height = max(2, int(video_info.height * tw / video_info.width) // 2 * 2)
+    fg_filters = [f"scale={tw}:{fg_height}"]
+    if fg_height > th:
+        fg_filters.append(f"crop={tw}:{th}")
+    y_offset = max(0, (th - fg_height) // 2)
+
+    return bg_filters, fg_filters, y_offset
+
+
+def _rotation_filters(rotation: int) -> list[str]:
+    """Filters turning decoded frames upright (ffmpeg's CLI does this itself)"""
+    return {
+        90: ["transpose=clock"],
+        180: ["hflip", "vflip"],
+        270: ["transpose=cclock"],
+    }.get(rotation, [])
+
+
+def _fade_filters(options: ConversionOptions, output_duration: float) -> list[str]:
+    """Video fade-out over the last video_fadeout seconds of the output"""
+    if options.video_fadeout <= 0:
+        return []
+    fade_start = max(0.0, output_duration - options.video_fadeout)
+    return [f"fade=t=out:st={fade_start:.3f}:d={options.video_fadeout}"]
+
+
+@functools.cache
+def available_encoders() -> frozenset:
+    """
+    List the encoders compiled into the ffmpeg binary (queried once)
+
+    Returns:
+        Set of encoder names, empty if ffmpeg cannot be run
+    """
+    try:
+        result = subprocess.run(
+            [get_setting("FFMPEG_BINARY"), "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+
+    # Lines look like " V....D libx264   libx264 H.264 / AVC ..."
+    _, _, listing = result.stdout.partition("------")
+    return frozenset(line.split()[1] for line in listing.splitlines() if len(line.split()) > 1)
+
+
+@functools.cache
+def _encoder_works(encoder: str) -> bool:
+    """Check that a hardware encoder can open (compiled in does not mean a device exists)"""
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-nostdin", "-loglevel", "error"]
+    cmd += ["-f", "lavfi", "-i", "color=size=256x256:duration=0.1", "-frames:v", "1"]
+    cmd += ["-c:v", encoder, "-f", "null", "-"]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def resolve_codec(codec: str) -> str:
+    """
+    Resolve the video encoder to use
+
+    Args:
+        codec: Encoder name, or "auto" for the first working hardware encoder
+
+    Returns:
+        ffmpeg encoder name (falls back to libx264)
+    """
+    if codec != "auto":
+        return codec
+
+    encoders = available_encoders()
+    for encoder in HARDWARE_ENCODERS:
+        if encoder in encoders and _encoder_works(encoder):
+            return encoder
+    return "libx264"
+
+
+def _convert_with_ffmpeg(
+    video_path: Path,
+    output_path: Path,
+    video_info: VideoInfo,
+    options: ConversionOptions,
+    report_progress: Callable[[float], None],
+) -> None:
+    """Run the whole conversion as a single native ffmpeg process"""
+    start_time, length = resolve_segment(video_info, options)
+    output_duration = length / options.speed
+    if start_time > 0 or length < video_info.duration:
+        logger.info("Using segment: %.1fs - %.1fs", start_time, start_time + length)
+    if options.speed != 1.0:
+        logger.info("Applying speed: %.1fx", options.speed)
+
+    cmd = [get_setting("FFMPEG_BINARY"), "-hide_banner", "-nostdin", "-y", "-loglevel", "error"]
+    cmd += ["-ss", f"{start_time:.3f}", "-t", f"{length:.3f}", "-i", str(video_path)]
+    cmd += ["-filter_complex", build_filter_complex(video_info, options, output_duration)]
+    cmd += ["-map", "[v]"]
+    if video_info.has_audio:
+        cmd += ["-map", "[a]", "-c:a", "aac"]
+    codec = resolve_codec(options.codec)
+    logger.info("Encoding with: %s", codec)
+    cmd += ["-c:v", codec, *ENCODER_ARGS.get(codec, []), "-b:v", options.output_bitrate]
+    cmd += ["-pix_fmt", "yuv420p", "-r", str(options.output_fps)]
+    cmd += ["-progress", "pipe:1", "-nostats", str(output_path)]
+
+    logger.info("Exporting to: %s", output_path)
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    # Drain stderr concurrently so a chatty ffmpeg can never block on a full pipe
+    stderr_lines: list[str] = []
+    stderr_reader = threading.Thread(
+        target=stderr_lines.extend, args=(process.stderr,), daemon=True
+    )
+    stderr_reader.start()
+    try:
+        for line in process.stdout:
+            # out_time_ms is reported in microseconds despite its name
+            key, _, value = line.strip().partition("=")
+            if key == "out_time_ms" and value.isdigit() and output_duration > 0:
+                elapsed = int(value) / 1_000_000
+                report_progress(10 + 90 * min(1.0, elapsed / output_duration))
+        process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr_reader.join()
+
+    stderr = "".join(stderr_lines)
+    if process.returncode != 0:
+        raise ProcessingError(f"ffmpeg exited with code {process.returncode}: {stderr.strip()}")
+
+
+def _build_audio_graph(in_audio, start_time: float, length: float, options, output_duration):
+    """Build a libavfilter graph that trims, speeds up and fades the audio track"""
+    filters = [
+        ("atrim", f"start={start_time:.3f}:end={start_time + length:.3f}"),
+        ("asetpts", "PTS-STARTPTS"),
+    ]
+    if options.speed != 1.0:
+        filters += [("atempo", str(f)) for f in atempo_factors(options.speed)]
+    if options.audio_fadeout > 0:
+        fade_start = max(0.0, output_duration - options.audio_fadeout)
+        filters.append(("afade", f"t=out:st={fade_start:.3f}:d={options.audio_fadeout}"))
+
+    graph = av.filter.Graph()
+    nodes = [graph.add_abuffer(template=in_audio)]
+    nodes += [graph.add(name, args) for name, args in filters]
+    nodes.append(graph.add("abuffersink"))
+    graph.link_nodes(*nodes).configure()
+    return graph
+
+
+def _build_video_graph(
+    in_video, video_info: VideoInfo, options: ConversionOptions, start_time: float, length: float
+):
+    """
+    Build a libavfilter graph for the whole video path of the PyAV engine
+
+    Trims the segment, applies speed, resamples to the output frame rate,
+    then renders the same 9:16 layout and fade as build_filter_complex.
+    """
+    output_duration = length / options.speed
+    bg_filters, fg_filters, y_offset = _layout_filters(video_info, options)
+    graph = av.filter.Graph()
+
+    def chain(filters: list[str]) -> tuple:
+        nodes = [graph.add(*spec.split("=", 1)) for spec in filters]
+        for upstream, downstream in zip(nodes, nodes[1:]):
+            upstream.link_to(downstream)
+        return nodes[0], nodes[-1]
+
+    pre_first, pre_last = chain(
+        [
+            f"trim=start={start_time:.3f}:duration={length:.3f}",
+            f"setpts=(PTS-STARTPTS)/{options.speed}",
+            f"fps={options.output_fps}",
+            # PyAV decodes in stored orientation; the layout is sized for the displayed one
+            *_rotation_filters(video_info.rotation),
+            "split=2",
+        ]
+    )
+    bg_first, bg_last = chain(bg_filters)
+    fg_first, fg_last = chain(fg_filters)
+    post_first, post_last = chain(
+        [f"overlay=0:{y_offset}", "setsar=1", *_fade_filters(options, output_duration)]
+        + ["format=yuv420p"]
+    )
+
+    graph.add_buffer(template=in_video).link_to(pre_first)
+    pre_last.link_to(bg_first, 0)
+    pre_last.link_to(fg_first, 1)
+    bg_last.link_to(post_first, 0, 0)
+    fg_last.link_to(post_first, 0, 1)
+    post_last.link_to(graph.add("buffersink"))
+    graph.configure()
+    return graph
+
+
+def _pull_frames(graph) -> Iterator:
+    """Yield every frame currently available from a filter graph"""
+    while True:
+        try:
+            yield graph.pull()
+        except (BlockingIOError, EOFError, av.error.EOFError):
+            return
+
+
+def _pull_audio(graph, out_audio, dst) -> None:
+    """Encode and mux every audio frame currently available from the filter graph"""
+    for frame in _pull_frames(graph):
+        frame.pts = None
+        for packet in out_audio.encode(frame):
+            dst.mux(packet)
+
+
+def _put_unless_stopped(outbox: queue.Queue, entry: tuple, stop: threading.Event) -> bool:
+    """Put entry into a bounded queue, giving up once stop is set; True if it was queued"""
+    while not stop.is_set():
+        try:
+            outbox.put(entry, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _pipeline_stage(items: Iterable, outbox: queue.Queue, stop: threading.Event) -> None:
+    """Feed items into a bounded queue, then an end marker carrying any error raised"""
+    error: Optional[BaseException] = None
+    try:
+        for item in items:
+            if not _put_unless_stopped(outbox, (False, item), stop):
+                return
+    except BaseException as e:
+        error = e
+    # The consumer may have stopped reading, so the end marker must not block either
+    _put_unless_stopped(outbox, (True, error), stop)
+
+
+def _drain(inbox: queue.Queue, stop: threading.Event) -> Iterator:
+    """Yield items from a _pipeline_stage queue until its end marker, re-raising its error"""
+    while not stop.is_set():
+        try:
+            is_end, value = inbox.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if is_end:
+            if value is not None:
+                raise value
+            return
+        yield value
+
+
+def _convert_with_pyav(
+    video_path: Path,
+    output_path: Path,
+    video_info: VideoInfo,
+    options: ConversionOptions,
+    report_progress: Callable[[float], None],
+) -> None:
+    """
+    Decode, composite and encode in-process with PyAV (no frame pipe to ffmpeg)
+
+    Segment, speed, frame rate, layout and fade all run inside a libavfilter
+    graph, so frames never pass through NumPy. Decoding, filtering and
+    encoding run on three threads connected by bounded queues.
+    """
+    start_time, length = resolve_segment(video_info, options)
+    output_duration = length / options.speed
+    total_frames = max(1, round(output_duration * options.output_fps))
+
+    logger.info("Exporting to: %s", output_path)
+    with av.open(str(video_path)) as src, av.open(str(output_path), "w") as dst:
+        in_video = src.streams.video[0]
+        in_video.thread_type = "AUTO"
+        in_audio = src.streams.audio[0] if video_info.has_audio and src.streams.audio else None
+
+        codec = resolve_codec(options.codec)
+        logger.info("Encoding with: %s", codec)
+        encoder_args = ENCODER_ARGS.get(codec, [])
+        out_video = dst.add_stream(codec, rate=options.output_fps)
+        out_video.width = options.target_width
+        out_video.height = options.target_height
+        out_video.pix_fmt = "yuv420p"
+        out_video.bit_rate = parse_bitrate(options.output_bitrate)
+        out_video.options = {
+            name.lstrip("-"): value for name, value in zip(encoder_args[::2], encoder_args[1::2])
+        }
+
+        video_graph = _build_video_graph(in_video, video_info, options, start_time, length)
+        audio_graph = out_audio = None
+        if in_audio is not None:
+            out_audio = dst.add_stream("aac", rate=in_audio.rate)
+            audio_graph = _build_audio_graph(in_audio, start_time, length, options, output_duration)
+
+        if start_time > 0:
+            src.seek(int(start_time * av.time_base))
+
+        streams = [in_video] + ([in_audio] if in_audio is not None else [])
+        end_time = start_time + length
+
+        # Items are (is_video, frame) so audio can travel through the same queues
+        def decode_items() -> Iterator[tuple]:
+            for packet in src.demux(*streams):
+                for frame in packet.decode():
+                    is_video = packet.stream is in_video
+                    if is_video and float(frame.time) >= end_time:
+                        return
+                    yield is_video, frame
+
+        def filter_items(items: Iterable[tuple]) -> Iterator[tuple]:
+            for is_video, frame in items:
+                if not is_video:
+                    yield is_video, frame
+                    continue
+                video_graph.push(frame)
+                yield from ((True, out) for out in _pull_frames(video_graph))
+            video_graph.push(None)
+            yield from ((True, out) for out in _pull_frames(video_graph))
+
+        stop = threading.Event()
+        decoded: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        filtered: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        workers = [
+            threading.Thread(target=_pipeline_stage, args=(decode_items(), decoded, stop)),
+            threading.Thread(
+                target=_pipeline_stage, args=(filter_items(_drain(decoded, stop)), filtered, stop)
+            ),
+        ]
+        for worker in workers:
+            worker.start()
+
+        index = 0
+        try:
+            for is_video, frame in _drain(filtered, stop):
+                if not is_video:
+                    audio_graph.push(frame)
+                    _pull_audio(audio_graph, out_audio, dst)
+                    continue
+                if index >= total_frames:
+                    continue
+                frame.pts = index
+                for packet in out_video.encode(frame):
+                    dst.mux(packet)
+                index += 1
+                report_progress(10 + 90 * index / total_frames)
+        finally:
+            # Workers touch the input container, so stop them before it closes
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        for packet in out_video.encode():
+            dst.mux(packet)
+        if audio_graph is not None:
+            audio_graph.push(None)
+            _pull_audio(audio_graph, out_audio, dst)
+            for packet in out_audio.encode():
+                dst.mux(packet)
+
+
+def _convert_with_moviepy(
+    video_path: Path,
+    output_path: Path,
+    video_info: VideoInfo,
+    options: ConversionOptions,
+    report_progress: Callable[[float], None],
+) -> None:
+    """Fallback conversion that composites every frame in Python with OpenCV"""
+    # Load video
+    clip = VideoFileClip(str(video_path))
+
+    # Apply segment selection if needed
+    if not video_info.is_short:
+        if options.duration is not None:
+            # Segment mode
+            end_time = min(options.start_time + options.duration, video_info.duration)
+            logger.info("Using segment: %.1fs - %.1fs", options.start_time, end_time)
+            clip = clip.subclip(options.start_time, end_time)
+        elif options.start_time > 0:
+            # Start from specific time
+            logger.info("Starting from: %.1fs", options.start_time)
+            clip = clip.subclip(options.start_time)
+
+    report_progress(20)
+
+    # Apply speed
+    if options.speed != 1.0:
+        logger.info("Applying speed: %.1fx", options.speed)
+        video_clip = clip.without_audio().fx(vfx.speedx, options.speed)
+
+        # Keep audio at original speed or adjust based on preference
+        if clip.audio:
+            audio_clip = clip.audio.fx(vfx.speedx, options.speed)
+            if options.audio_fadeout > 0:
+                audio_clip = audio_clip.audio_fadeout(options.audio_fadeout)
+        else:
+            audio_clip = None
+    else:
+        video_clip = clip.without_audio()
+        audio_clip = clip.audio
+        if audio_clip and options.audio_fadeout > 0:
+            audio_clip = audio_clip.audio_fadeout(options.audio_fadeout)
+
+    report_progress(40)
+
+    # Apply fade effects
+    if options.video_fadeout > 0:
+        logger.info("Applying video fadeout: %.1fs", options.video_fadeout)
+        video_clip = video_clip.crossfadeout(options.video_fadeout)
+
+    report_progress(50)
+
+    # Apply vertical layout
+    logger.info("Applying 9:16 layout with blurred background...")
+    frame_processor = make_frame_processor(options)
+
+    vertical_clip = video_clip.fl_image(frame_processor)
+
+    # Add audio back
+    if audio_clip:
+        vertical_clip = vertical_clip.set_audio(audio_clip)
+
+    report_progress(60)
+
+    # Export
+    logger.info("Exporting to: %s", output_path)
+    vertical_clip.write_videofile(
+        str(output_path),
+        codec=resolve_codec(options.codec),
+        audio_codec="aac",
+        fps=options.output_fps,
+        bitrate=options.output_bitrate,
+        preset="medium",
+        threads=4,
+        logger=None,  # Suppress moviepy logger
+    )
+
+    # Cleanup
+    clip.close()
+    vertical_clip.close()
+
+
 def convert_to_shorts(
     video_path: Path,
     output_path: Path,
@@ -289,14 +1594,24 @@ def convert_to_shorts(
     if options is None:
         options = ConversionOptions()
 
+    last_reported = -1.0
+
     def report_progress(value: float):
-        """Report progress to callback"""
-        if progress_callback:
-            progress_callback(min(100.0, max(0.0, value)))
+        """Report progress to callback, skipping repeats of the last value"""
+        nonlocal last_reported
+        value = min(100.0, max(0.0, value))
+        if progress_callback and value != last_reported:
+            last_reported = value
+            progress_callback(value)
 
     try:
         report_progress(0)
 
+        if options.engine not in ENGINES:
+            raise ValidationError(f"Unknown engine: {options.engine}")
+        if options.engine == "pyav" and av is None:
+            raise ValidationError("The pyav engine requires PyAV (pip install av)")
+
         # Get video info
         logger.info("Loading video: %s", video_path.name)
         video_info = get_video_info(video_path)
@@ -309,93 +1624,17 @@ def convert_to_shorts(
 
         report_progress(10)
 
-        # Load video
-        clip = VideoFileClip(str(video_path))
-
-        # Apply segment selection if needed
-        if not video_info.is_short:
-            if options.duration is not None:
-                # Segment mode
-                end_time = min(options.start_time + options.duration, video_info.duration)
-                logger.info("Using segment: %.1fs - %.1fs", options.start_time, end_time)
-                clip = clip.subclip(options.start_time, end_time)
-            elif options.start_time > 0:
-                # Start from specific time
-                logger.info("Starting from: %.1fs", options.start_time)
-                clip = clip.subclip(options.start_time)
-
-        report_progress(20)
-
-        # Apply speed
-        if options.speed != 1.0:
-            logger.info("Applying speed: %.1fx", options.speed)
-            video_clip = clip.without_audio().fx(vfx.speedx, options.speed)
-
-            # Keep audio at original speed or adjust based on preference
-            if clip.audio:
-                audio_clip = clip.audio.fx(vfx.speedx, options.speed)
-                if options.audio_fadeout > 0:
-                    audio_clip = audio_clip.audio_fadeout(options.audio_fadeout)
-            else:
-                audio_clip = None
-        else:
-            video_clip = clip.without_audio()
-            audio_clip = clip.audio
-            if audio_clip and options.audio_fadeout > 0:
-                audio_clip = audio_clip.audio_fadeout(options.audio_fadeout)
-
-        report_progress(40)
-
-        # Apply fade effects
-        if options.video_fadeout > 0:
-            logger.info("Applying video fadeout: %.1fs", options.video_fadeout)
-            video_clip = video_clip.crossfadeout(options.video_fadeout)
-
-        report_progress(50)
-
-        # Apply vertical layout
-        logger.info("Applying 9:16 layout with blurred background...")
-
-        def frame_processor(frame):
-            return apply_vertical_layout(
-                frame,
-                options.target_width,
-                options.target_height,
-                options.blur_kernel,
-                options.blur_sigma,
-                options.blur_brightness,
-                options.blur_darken,
-            )
-
-        vertical_clip = video_clip.fl_image(frame_processor)
-
-        # Add audio back
-        if audio_clip:
-            vertical_clip = vertical_clip.set_audio(audio_clip)
-
-        report_progress(60)
-
-        # Export
-        logger.info("Exporting to: %s", output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        vertical_clip.write_videofile(
-            str(output_path),
-            codec="libx264",
-            audio_codec="aac",
-            fps=options.output_fps,
-            bitrate=options.output_bitrate,
-            preset="medium",
-            threads=4,
-            logger=None,  # Suppress moviepy logger
-        )
+        if options.engine == "moviepy":
+            _convert_with_moviepy(video_path, output_path, video_info, options, report_progress)
+        elif options.engine == "pyav":
+            _convert_with_pyav(video_path, output_path, video_info, options, report_progress)
+        else:
+            _convert_with_ffmpeg(video_path, output_path, video_info, options, report_progress)
 
         report_progress(100)
 
-        # Cleanup
-        clip.close()
-        vertical_clip.close()
-
         logger.info("✓ Conversion complete: %s", output_path.name)
         return output_path
 
@@ -430,7 +1669,7 @@ def auto_convert(video_path: Path, output_path: Path) -> Path:
         options = ConversionOptions()
     else:
         # Over 60 seconds: calculate speed needed
-        required_speed = video_info.duration / 59.0  # Leave 1s margin
+        required_speed = video_info.suggested_speed
         options = ConversionOptions(speed=required_speed)
         logger.info("Video is %.1fs, using %.2fx speed", video_info.duration, required_speed)
 
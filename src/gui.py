@@ -4,12 +4,17 @@ sh0rtifier - GUI Interface (PyQt6)
 Cross-platform GUI using PyQt6.
 """
 
+import contextlib
+import os
+import queue
 import sys
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import QSettings, Qt, QThread, QTimer, pyqtBoundSignal, pyqtSignal
 from PyQt6.QtWidgets import (
     QApplication,
     QButtonGroup,
@@ -29,37 +34,317 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from core import ConversionOptions, VideoInfo, convert_to_shorts, get_video_info
+if TYPE_CHECKING:
+    from core import ConversionOptions, VideoInfo
+
+# core pulls in OpenCV, NumPy and MoviePy; it is imported on first use so the
+# window can appear before that stack has loaded
+_core = None
+
+
+def load_core():
+    """Import the core module on first use and return it"""
+    global _core
+    if _core is None:
+        import core
+
+        _core = core
+    return _core
+
+
+def warm_up_core():
+    """Import core on a background thread so it is ready before it is first needed"""
+    threading.Thread(target=load_core, daemon=True).start()
+
+
+# Minimum seconds between progress updates sent to the UI (~10 Hz)
+PROGRESS_INTERVAL = 0.1
+
+# convert_to_shorts reports up to this percent while it probes and validates;
+# anything above comes from the encoder
+ENCODE_START_PERCENT = 10
+
+# Longer paths are shown as "..." plus their tail (full path in the tooltip)
+PATH_LABEL_MAX_CHARS = 80
+
+# Dark theme, built once at import and shared by every window. Individual
+# labels are styled through their objectName here rather than with their
+# own setStyleSheet calls, so the whole theme is parsed in one pass.
+STYLESHEET = """
+    QMainWindow {
+        background-color: #2b2b2b;
+    }
+    QWidget {
+        background-color: #2b2b2b;
+        color: #ffffff;
+    }
+    QScrollArea {
+        background-color: #2b2b2b;
+        border: none;
+    }
+    QLabel {
+        color: #ffffff;
+    }
+    QGroupBox {
+        font-weight: bold;
+        color: #ffffff;
+        border: 2px solid #4a4a4a;
+        border-radius: 6px;
+        margin-top: 12px;
+        padding-top: 15px;
+        background-color: #333333;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 15px;
+        padding: 0 8px;
+        color: #4da6ff;
+    }
+    QPushButton {
+        background-color: #0066cc;
+        color: white;
+        border: none;
+        border-radius: 5px;
+        padding: 10px 20px;
+        font-weight: bold;
+        font-size: 13px;
+    }
+    QPushButton:hover {
+        background-color: #0052a3;
+    }
+    QPushButton:pressed {
+        background-color: #003d7a;
+    }
+    QPushButton:disabled {
+        background-color: #555555;
+        color: #999999;
+    }
+    QRadioButton {
+        color: #ffffff;
+        spacing: 8px;
+    }
+    QRadioButton::indicator {
+        width: 18px;
+        height: 18px;
+    }
+    QRadioButton::indicator:checked {
+        background-color: #0066cc;
+        border: 2px solid #0066cc;
+        border-radius: 9px;
+    }
+    QRadioButton::indicator:unchecked {
+        background-color: #555555;
+        border: 2px solid #777777;
+        border-radius: 9px;
+    }
+    QDoubleSpinBox {
+        background-color: #3d3d3d;
+        color: #ffffff;
+        border: 1px solid #555555;
+        border-radius: 3px;
+        padding: 5px;
+    }
+    QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
+        background-color: #555555;
+        border: none;
+        width: 18px;
+    }
+    QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
+        background-color: #666666;
+    }
+    QProgressBar {
+        border: 2px solid #555555;
+        border-radius: 6px;
+        text-align: center;
+        height: 28px;
+        background-color: #3d3d3d;
+        color: #ffffff;
+        font-weight: bold;
+        font-size: 14px;
+    }
+    QProgressBar::chunk {
+        background-color: #0066cc;
+        border-radius: 4px;
+    }
+    QMenuBar {
+        background-color: #2b2b2b;
+        color: #ffffff;
+    }
+    QMenuBar::item:selected {
+        background-color: #0066cc;
+    }
+    QMenu {
+        background-color: #2b2b2b;
+        color: #ffffff;
+        border: 1px solid #555555;
+    }
+    QMenu::item:selected {
+        background-color: #0066cc;
+    }
+    QLabel#titleLabel {
+        font-family: Arial;
+        font-size: 24pt;
+        font-weight: bold;
+    }
+    QLabel#videoInfoLabel {
+        color: gray;
+    }
+    QLabel#statusLabel {
+        color: #ffffff;
+        font-size: 13px;
+    }
+    QLabel#hintLabel {
+        color: gray;
+        font-style: italic;
+    }
+    QLabel#okLabel {
+        color: green;
+        font-weight: bold;
+    }
+    QLabel#warningLabel {
+        color: orange;
+        font-weight: bold;
+    }
+    QLabel#sectionLabel {
+        font-weight: bold;
+        margin-top: 10px;
+    }
+"""
+
+# Milliseconds the speed spinbox must settle before the output duration is recomputed
+SPEED_LABEL_DEBOUNCE_MS = 50
+
+# Progress values arriving within this many milliseconds share one repaint (~30 Hz)
+PROGRESS_REPAINT_MS = 33
+
+# Probe results kept for re-selected files, keyed by (path, size, mtime)
+PROBE_CACHE_SIZE = 32
+
+
+def connect_queued(signal: pyqtBoundSignal, slot: Callable[..., object]) -> None:
+    """Connect a signal so the slot always runs in the receiver's thread via the event loop"""
+    # PyQt6's stubs leave out connect()'s connection-type argument
+    signal.connect(slot, Qt.ConnectionType.QueuedConnection)  # type: ignore[call-arg]
+
+
+class ConversionCancelledError(Exception):
+    """Raised from the progress callback to abort a running conversion"""
 
 
 class VideoProcessorThread(QThread):
-    """Background thread for video processing"""
+    """Long-lived background thread that converts queued jobs one at a time"""
 
-    progress_updated = pyqtSignal(float)
+    progress_updated = pyqtSignal(int)
     processing_finished = pyqtSignal(Path)
     processing_failed = pyqtSignal(str)
-
-    def __init__(self, processor, input_path, output_path, options):
-        super().__init__()
-        self.processor = processor
-        self.input_path = input_path
-        self.output_path = output_path
-        self.options = options
+    processing_cancelled = pyqtSignal()
+    overwrite_requested = pyqtSignal(Path)
+    # "preparing" until the engine reports real progress, then "encoding"
+    phase_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs: queue.Queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._overwrite_answered = threading.Event()
+        self._overwrite_allowed = False
+
+    def submit(self, input_path: Path, output_path: Path, options: "ConversionOptions"):
+        """Queue a conversion (called from the UI thread)"""
+        self._jobs.put((input_path, output_path, options))
+
+    def cancel(self):
+        """Abort the running conversion at its next progress report"""
+        self._cancel.set()
+
+    def stop(self):
+        """Cancel the running conversion and end the thread once it returns"""
+        self.cancel()
+        self.answer_overwrite(False)
+        self._jobs.put(None)
+
+    def answer_overwrite(self, allowed: bool):
+        """Resume a run waiting on overwrite_requested (called from the UI thread)"""
+        self._overwrite_allowed = allowed
+        self._overwrite_answered.set()
 
     def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._cancel.clear()
+            self._overwrite_answered.clear()
+            self.process(*job)
+            # Don't keep the finished job's paths and options alive while idle
+            job = None
+
+    def process(self, input_path: Path, output_path: Path, options: "ConversionOptions"):
+        """Convert one job, reporting the outcome through signals"""
+        # Check for an existing output here, off the UI thread (it may be a slow mount)
+        if os.path.exists(output_path):
+            self.overwrite_requested.emit(output_path)
+            self._overwrite_answered.wait()
+            if not self._overwrite_allowed or self._cancel.is_set():
+                self.processing_cancelled.emit()
+                return
+
+        last_time = 0.0
+        last_value = -1
+        encoding = False
+        self.phase_changed.emit("preparing")
+
         try:
             # Use convert_to_shorts function directly
             def progress_callback(progress: float):
-                self.progress_updated.emit(progress)
-
-            result_path = convert_to_shorts(
-                self.input_path, self.output_path, self.options, progress_callback
+                if self._cancel.is_set():
+                    raise ConversionCancelledError
+                nonlocal last_time, last_value, encoding
+                if not encoding and progress > ENCODE_START_PERCENT:
+                    encoding = True
+                    self.phase_changed.emit("encoding")
+                # Throttle: ffmpeg reports many times per second, the bar shows
+                # whole percents and needs ~10 Hz
+                value = int(progress)
+                if value == last_value:
+                    return
+                now = time.monotonic()
+                if value < 100 and now - last_time < PROGRESS_INTERVAL:
+                    return
+                last_time, last_value = now, value
+                self.progress_updated.emit(value)
+
+            result_path = load_core().convert_to_shorts(
+                input_path, output_path, options, progress_callback
             )
             self.processing_finished.emit(result_path)
+        except ConversionCancelledError:
+            # The engine stops its encoder on the way out; drop the partial file
+            with contextlib.suppress(OSError):
+                os.remove(output_path)
+            self.processing_cancelled.emit()
         except Exception as e:
             self.processing_failed.emit(str(e))
 
 
+class VideoProbeThread(QThread):
+    """Background thread for reading video info"""
+
+    probe_finished = pyqtSignal(Path, object)
+    probe_failed = pyqtSignal(Path, str)
+
+    def __init__(self, video_path: Path, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+
+    def run(self):
+        try:
+            video_info = load_core().get_video_info(self.video_path)
+            self.probe_finished.emit(self.video_path, video_info)
+        except Exception as e:
+            self.probe_failed.emit(self.video_path, str(e))
+
+
 class ShortsConverterGUI(QMainWindow):
     """Main GUI application"""
 
@@ -68,13 +353,56 @@ class ShortsConverterGUI(QMainWindow):
 
         # State
         self.input_file: Optional[Path] = None
-        self.output_folder: Optional[Path] = None
+        self.output_folder: Optional[str] = None
         self.video_info: Optional[VideoInfo] = None
         self.is_processing = False
-        self.processor_thread: Optional[VideoProcessorThread] = None
 
+        # One worker for the whole session; conversions are queued to it
+        self.processor_thread = VideoProcessorThread(self)
+        # Queued connections: slots always run on the UI thread, never the worker
+        worker = self.processor_thread
+        connect_queued(worker.progress_updated, self.update_progress)
+        connect_queued(worker.processing_finished, self.on_conversion_complete)
+        connect_queued(worker.processing_failed, self.on_conversion_error)
+        connect_queued(worker.processing_cancelled, self.on_conversion_cancelled)
+        connect_queued(worker.overwrite_requested, self.on_overwrite_requested)
+        connect_queued(worker.phase_changed, self.on_phase_changed)
+        self.processor_thread.start()
+
+        # Debounce output-duration updates while the speed is being scrolled
+        self._speed_label_timer = QTimer(self)
+        self._speed_label_timer.setSingleShot(True)
+        self._speed_label_timer.setInterval(SPEED_LABEL_DEBOUNCE_MS)
+        self._speed_label_timer.timeout.connect(self.update_speed_label)
+        self._speed_duration = 0.0
+        self._speed_text = ""
+
+        # Progress values are held here and painted by one timer tick
+        self._pending_progress = 0
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(PROGRESS_REPAINT_MS)
+        self._progress_timer.timeout.connect(self._flush_progress)
+        self._suggested_speed = 1.0
+        self._input_stem = ""
+        self._input_parent = ""
+
+        # Reselecting an unchanged file reuses its info without a probe thread
+        self._probe_cache: OrderedDict[tuple, VideoInfo] = OrderedDict()
+        self._probe_key: Optional[tuple] = None
+
+        # Start file dialogs in the last used folders instead of the working directory
+        self.settings = QSettings("sl0thm4n", "sh0rtifier")
+        self._last_input_dir = self.settings.value("last_input_dir", "", type=str)
+        self._last_output_dir = self.settings.value("last_output_dir", "", type=str)
+
+        # Style before building widgets so they are polished once, not restyled.
+        # main() installs the theme application-wide; only a window created
+        # without it (e.g. embedded or in tests) carries its own copy.
+        app = QApplication.instance()
+        if not isinstance(app, QApplication) or app.styleSheet() != STYLESHEET:
+            self.setStyleSheet(STYLESHEET)
         self.init_ui()
-        self.apply_styles()
 
     def init_ui(self):
         """Initialize UI components"""
@@ -103,8 +431,7 @@ class ShortsConverterGUI(QMainWindow):
 
         # === Title ===
         title_label = QLabel("sh0rtifier")
-        title_font = QFont("Arial", 24, QFont.Weight.Bold)
-        title_label.setFont(title_font)
+        title_label.setObjectName("titleLabel")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         scroll_layout.addWidget(title_label)
 
@@ -119,11 +446,10 @@ class ShortsConverterGUI(QMainWindow):
         file_layout = QVBoxLayout()
 
         self.file_path_label = QLabel("No file selected")
-        self.file_path_label.setWordWrap(True)
         file_layout.addWidget(self.file_path_label)
 
         self.video_info_label = QLabel("")
-        self.video_info_label.setStyleSheet("color: gray;")
+        self.video_info_label.setObjectName("videoInfoLabel")
         file_layout.addWidget(self.video_info_label)
 
         select_file_btn = QPushButton("📁 Browse Video File")
@@ -138,7 +464,6 @@ class ShortsConverterGUI(QMainWindow):
         output_layout = QVBoxLayout()
 
         self.output_path_label = QLabel("Same as input file")
-        self.output_path_label.setWordWrap(True)
         output_layout.addWidget(self.output_path_label)
 
         select_output_btn = QPushButton("📁 Browse Output Folder")
@@ -151,6 +476,7 @@ class ShortsConverterGUI(QMainWindow):
         # === Options Section (dynamic) ===
         self.options_group = QGroupBox("Step 3: Conversion Options")
         self.options_layout = QVBoxLayout()
+        self.build_options_panels()
         self.create_default_options_ui()
         self.options_group.setLayout(self.options_layout)
         scroll_layout.addWidget(self.options_group)
@@ -163,12 +489,14 @@ class ShortsConverterGUI(QMainWindow):
 
         # === Progress Bar (outside scroll) ===
         self.progress_bar = QProgressBar()
+        # Explicit determinate 0-100 range; (0, 0) would switch to the animated busy mode
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
         main_layout.addWidget(self.progress_bar)
 
         self.status_label = QLabel("Ready")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.status_label.setStyleSheet("color: #ffffff; font-size: 13px;")
+        self.status_label.setObjectName("statusLabel")
         main_layout.addWidget(self.status_label)
 
         # === Convert Button ===
@@ -178,6 +506,11 @@ class ShortsConverterGUI(QMainWindow):
         self.convert_btn.setMinimumHeight(40)
         main_layout.addWidget(self.convert_btn)
 
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self.cancel_conversion)
+        main_layout.addWidget(self.cancel_btn)
+
         # Menu bar
         self.create_menu_bar()
 
@@ -202,62 +535,54 @@ class ShortsConverterGUI(QMainWindow):
         about_action = help_menu.addAction("&About")
         about_action.triggered.connect(self.show_about)
 
-    def create_default_options_ui(self):
-        """Create default options UI (no video selected)"""
-        # Clear existing widgets
-        while self.options_layout.count():
-            child = self.options_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        info_label = QLabel("Select a video file to see conversion options")
-        info_label.setStyleSheet("color: gray; font-style: italic;")
-        self.options_layout.addWidget(info_label)
+    def build_options_panels(self):
+        """Build the default and short-video option panels (the long-video one is lazy)"""
+        # Default panel (no video selected)
+        self.default_panel = QLabel("Select a video file to see conversion options")
+        self.default_panel.setObjectName("hintLabel")
+        self.options_layout.addWidget(self.default_panel)
 
-    def create_options_ui_for_short_video(self):
-        """Create options UI for videos under 60 seconds"""
-        # Clear existing widgets
-        while self.options_layout.count():
-            child = self.options_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        info_label = QLabel(
+        # Short video panel
+        self.short_panel = QLabel(
             "✓ Video is under 60 seconds - will convert as-is with optimal settings"
         )
-        info_label.setStyleSheet("color: green; font-weight: bold;")
-        self.options_layout.addWidget(info_label)
+        self.short_panel.setObjectName("okLabel")
+        self.options_layout.addWidget(self.short_panel)
 
-    def create_options_ui_for_long_video(self):
-        """Create options UI for videos over 60 seconds"""
-        # Clear existing widgets
-        while self.options_layout.count():
-            child = self.options_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # Built on first use by ensure_long_panel
+        self.long_panel: Optional[QWidget] = None
+
+    def ensure_long_panel(self):
+        """Build the long-video options panel the first time it is needed"""
+        if self.long_panel is not None:
+            return
+
+        self.long_panel = QWidget()
+        long_layout = QVBoxLayout(self.long_panel)
+        long_layout.setContentsMargins(0, 0, 0, 0)
 
         # Warning
-        warning_label = QLabel(f"⚠️  Video is {self.video_info.duration:.1f}s (over 60s limit)")
-        warning_label.setStyleSheet("color: orange; font-weight: bold;")
-        self.options_layout.addWidget(warning_label)
+        self.long_warning_label = QLabel()
+        self.long_warning_label.setObjectName("warningLabel")
+        long_layout.addWidget(self.long_warning_label)
 
         # Mode selection
         mode_label = QLabel("Select conversion mode:")
-        mode_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
-        self.options_layout.addWidget(mode_label)
+        mode_label.setObjectName("sectionLabel")
+        long_layout.addWidget(mode_label)
 
-        self.mode_group = QButtonGroup()
+        self.mode_group = QButtonGroup(self)
 
-        speed_radio = QRadioButton("Speed Adjustment (Recommended)")
-        speed_radio.setChecked(True)
-        speed_radio.toggled.connect(self.update_options_visibility)
-        self.mode_group.addButton(speed_radio, 1)
-        self.options_layout.addWidget(speed_radio)
+        self.speed_radio = QRadioButton("Speed Adjustment (Recommended)")
+        self.speed_radio.setChecked(True)
+        self.speed_radio.toggled.connect(self.update_options_visibility)
+        self.mode_group.addButton(self.speed_radio, 1)
+        long_layout.addWidget(self.speed_radio)
 
         segment_radio = QRadioButton("Select Specific Segment")
         segment_radio.toggled.connect(self.update_options_visibility)
         self.mode_group.addButton(segment_radio, 2)
-        self.options_layout.addWidget(segment_radio)
+        long_layout.addWidget(segment_radio)
 
         # === Speed Options ===
         self.speed_widget = QWidget()
@@ -269,28 +594,28 @@ class ShortsConverterGUI(QMainWindow):
 
         speed_control_layout = QHBoxLayout()
 
-        suggested_speed = self.video_info.duration / 59.0
         self.speed_spinbox = QDoubleSpinBox()
         self.speed_spinbox.setRange(1.0, 4.0)
         self.speed_spinbox.setSingleStep(0.1)
-        self.speed_spinbox.setValue(suggested_speed)
         self.speed_spinbox.setDecimals(2)
         self.speed_spinbox.setSuffix("x")
-        self.speed_spinbox.valueChanged.connect(self.update_speed_label)
+        # Typed values are committed on Enter or focus loss, not per keystroke;
+        # arrow steps and the wheel still update live
+        self.speed_spinbox.setKeyboardTracking(False)
+        self.speed_spinbox.valueChanged.connect(self._speed_label_timer.start)
         speed_control_layout.addWidget(self.speed_spinbox)
 
         self.speed_result_label = QLabel()
-        self.update_speed_label()
         speed_control_layout.addWidget(self.speed_result_label)
         speed_control_layout.addStretch()
 
         speed_layout.addLayout(speed_control_layout)
 
-        suggested_btn = QPushButton(f"Use Suggested ({suggested_speed:.2f}x)")
-        suggested_btn.clicked.connect(lambda: self.speed_spinbox.setValue(suggested_speed))
-        speed_layout.addWidget(suggested_btn)
+        self.suggested_btn = QPushButton()
+        self.suggested_btn.clicked.connect(self.use_suggested_speed)
+        speed_layout.addWidget(self.suggested_btn)
 
-        self.options_layout.addWidget(self.speed_widget)
+        long_layout.addWidget(self.speed_widget)
 
         # === Segment Options ===
         self.segment_widget = QWidget()
@@ -301,9 +626,8 @@ class ShortsConverterGUI(QMainWindow):
         start_layout = QHBoxLayout()
         start_layout.addWidget(QLabel("Start Time (seconds):"))
         self.start_spinbox = QDoubleSpinBox()
-        self.start_spinbox.setRange(0, self.video_info.duration - 1)
-        self.start_spinbox.setValue(0)
         self.start_spinbox.setDecimals(1)
+        self.start_spinbox.setKeyboardTracking(False)
         start_layout.addWidget(self.start_spinbox)
         start_layout.addStretch()
         segment_layout.addLayout(start_layout)
@@ -313,22 +637,62 @@ class ShortsConverterGUI(QMainWindow):
         duration_layout.addWidget(QLabel("Duration (seconds):"))
         self.duration_spinbox = QDoubleSpinBox()
         self.duration_spinbox.setRange(1, 60)
-        self.duration_spinbox.setValue(min(60, self.video_info.duration))
         self.duration_spinbox.setDecimals(1)
+        self.duration_spinbox.setKeyboardTracking(False)
         duration_layout.addWidget(self.duration_spinbox)
         duration_layout.addStretch()
         segment_layout.addLayout(duration_layout)
 
-        self.options_layout.addWidget(self.segment_widget)
+        long_layout.addWidget(self.segment_widget)
+
+        self.options_layout.addWidget(self.long_panel)
+
+    def show_options_panel(self, panel: QWidget):
+        """Show one options panel and hide the others"""
+        for candidate in (self.default_panel, self.short_panel, self.long_panel):
+            if candidate is not None:
+                candidate.setVisible(candidate is panel)
+
+    def create_default_options_ui(self):
+        """Show default options UI (no video selected)"""
+        self.show_options_panel(self.default_panel)
+
+    def create_options_ui_for_short_video(self):
+        """Show options UI for videos under 60 seconds"""
+        self.show_options_panel(self.short_panel)
+
+    def create_options_ui_for_long_video(self):
+        """Reset the long-video options UI for the selected video and show it"""
+        self.ensure_long_panel()
+        duration = self.video_info.duration
+
+        # Texts and limits depend only on the duration; skip them when a
+        # video of the same length is selected again
+        if duration != self._speed_duration:
+            self.long_warning_label.setText(f"⚠️  Video is {duration:.1f}s (over 60s limit)")
+
+            # Computed once per video; reused by the spinbox default and the button
+            self._suggested_speed = self.video_info.suggested_speed
+            self._speed_duration = duration
+            self.suggested_btn.setText(f"Use Suggested ({self._suggested_speed:.2f}x)")
+            self.start_spinbox.setRange(0, duration - 1)
+
+        self.speed_spinbox.setValue(self._suggested_speed)
+        self.update_speed_label()
+        self.start_spinbox.setValue(0)
+        self.duration_spinbox.setValue(min(60, duration))
 
-        # Initial visibility
+        # Speed mode is the default for every newly selected video
+        self.speed_radio.setChecked(True)
         self.update_options_visibility()
+        self.show_options_panel(self.long_panel)
+
+    def use_suggested_speed(self):
+        """Set the speed multiplier to the suggested value"""
+        self.speed_spinbox.setValue(self._suggested_speed)
 
     def update_options_visibility(self):
         """Update which options are visible based on mode"""
-        if not hasattr(self, "mode_group"):
-            return
-
         mode = self.mode_group.checkedId()
 
         self.speed_widget.setVisible(mode == 1)
@@ -339,70 +703,145 @@ class ShortsConverterGUI(QMainWindow):
         if not self.video_info:
             return
 
-        speed = self.speed_spinbox.value()
-        output_duration = self.video_info.duration / speed
-        self.speed_result_label.setText(f"→ {output_duration:.1f}s output")
+        output_duration = self._speed_duration / self.speed_spinbox.value()
+        text = f"→ {output_duration:.1f}s output"
+        # Nearby speeds often round to the same text; leave the label alone then
+        if text != self._speed_text:
+            self._speed_text = text
+            self.speed_result_label.setText(text)
 
     def select_input_file(self):
         """Open file dialog to select input video"""
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Select Video File",
-            "",
+            self._dialog_start_dir(self._last_input_dir),
             "Video Files (*.mp4 *.mov *.mkv *.avi *.webm);;All Files (*)",
         )
 
         if file_path:
+            # Derive the pieces used later once, as strings
             self.input_file = Path(file_path)
-            self.file_path_label.setText(str(self.input_file))
+            self._input_stem = self.input_file.stem
+            self._input_parent = os.path.dirname(file_path)
+            self.set_path_label(self.file_path_label, file_path)
+
+            self._last_input_dir = self._input_parent
+            self.settings.setValue("last_input_dir", self._last_input_dir)
 
-            # Load video info
             try:
-                self.video_info = get_video_info(self.input_file)
-                info_text = (
-                    f"Duration: {self.video_info.duration:.1f}s | "
-                    f"Resolution: {self.video_info.width}x{self.video_info.height}"
-                )
-                self.video_info_label.setText(info_text)
-
-                # Update options UI based on duration
-                if self.video_info.is_short:
-                    self.create_options_ui_for_short_video()
-                else:
-                    self.create_options_ui_for_long_video()
-
-                # Enable convert button
-                self.convert_btn.setEnabled(True)
-
-                # Set default output folder
-                if not self.output_folder:
-                    self.output_folder = self.input_file.parent
-                    self.output_path_label.setText(str(self.output_folder))
-
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to load video info:\n{str(e)}")
-                self.input_file = None
-                self.video_info = None
+                stat = os.stat(file_path)
+                self._probe_key = (file_path, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                # Let the probe thread report the error
+                self._probe_key = None
+
+            cached = self._probe_cache.get(self._probe_key)
+            if cached is not None:
+                self._probe_cache.move_to_end(self._probe_key)
+                self.on_probe_finished(self.input_file, cached)
+                return
+
+            # Probe off the UI thread; ffprobe can be slow on large or remote files
+            self.video_info = None
+            self.video_info_label.setText("Loading video info...")
+            self.convert_btn.setEnabled(False)
+
+            probe_thread = VideoProbeThread(self.input_file, self)
+            probe_thread.probe_finished.connect(self.on_probe_finished)
+            probe_thread.probe_failed.connect(self.on_probe_failed)
+            probe_thread.finished.connect(probe_thread.deleteLater)
+            probe_thread.start()
+
+    def on_probe_finished(self, video_path: Path, video_info: "VideoInfo"):
+        """Called when video info has been read"""
+        # Ignore results for a file that is no longer selected
+        if video_path != self.input_file:
+            return
+
+        self.video_info = video_info
+        if self._probe_key is not None:
+            self._probe_cache[self._probe_key] = video_info
+            if len(self._probe_cache) > PROBE_CACHE_SIZE:
+                self._probe_cache.popitem(last=False)
+
+        info_text = (
+            f"Duration: {self.video_info.duration:.1f}s | "
+            f"Resolution: {self.video_info.width}x{self.video_info.height}"
+        )
+        self.video_info_label.setText(info_text)
+
+        # Update options UI based on duration
+        if self.video_info.is_short:
+            self.create_options_ui_for_short_video()
+        else:
+            self.create_options_ui_for_long_video()
+
+        # Enable convert button
+        self.convert_btn.setEnabled(not self.is_processing)
+
+        # Set default output folder
+        if not self.output_folder:
+            self.output_folder = self._input_parent
+            self.set_path_label(self.output_path_label, self.output_folder)
+
+    def on_probe_failed(self, video_path: Path, error_msg: str):
+        """Called when video info cannot be read"""
+        if video_path != self.input_file:
+            return
+
+        self.video_info_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to load video info:\n{error_msg}")
+        self.input_file = None
+        self.video_info = None
+        self.create_default_options_ui()
 
     def select_output_folder(self):
         """Open dialog to select output folder"""
-        folder_path = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        folder_path = QFileDialog.getExistingDirectory(
+            self,
+            "Select Output Folder",
+            self._dialog_start_dir(self._last_output_dir or self._last_input_dir),
+        )
 
         if folder_path:
-            self.output_folder = Path(folder_path)
-            self.output_path_label.setText(str(self.output_folder))
-
-    def get_conversion_options(self) -> ConversionOptions:
+            self.output_folder = folder_path
+            self.set_path_label(self.output_path_label, folder_path)
+
+            self._last_output_dir = folder_path
+            self.settings.setValue("last_output_dir", folder_path)
+
+    @staticmethod
+    def set_path_label(label: QLabel, path: str):
+        """Show a path on one line, keeping its end; the full path goes in the tooltip"""
+        if len(path) > PATH_LABEL_MAX_CHARS:
+            label.setText("..." + path[-(PATH_LABEL_MAX_CHARS - 3) :])
+        else:
+            label.setText(path)
+        label.setToolTip(path)
+
+    @staticmethod
+    def _dialog_start_dir(last_dir: str) -> str:
+        """Folder to open a file dialog in: the last used one, else ~/Videos, else home"""
+        if last_dir and os.path.isdir(last_dir):
+            return last_dir
+        home = str(Path.home())
+        videos = os.path.join(home, "Videos")
+        return videos if os.path.isdir(videos) else home
+
+    def get_conversion_options(self) -> "ConversionOptions":
         """Get conversion options from UI"""
+        # load_core() is untyped, so name the class type for the returns below
+        options_class: type[ConversionOptions] = load_core().ConversionOptions
         if self.video_info.is_short:
-            return ConversionOptions()
+            return options_class()
 
         mode = self.mode_group.checkedId()
 
         if mode == 1:  # Speed mode
-            return ConversionOptions(speed=self.speed_spinbox.value())
+            return options_class(speed=self.speed_spinbox.value())
         else:  # Segment mode
-            return ConversionOptions(
+            return options_class(
                 start_time=self.start_spinbox.value(), duration=self.duration_spinbox.value()
             )
 
@@ -429,19 +868,8 @@ class ShortsConverterGUI(QMainWindow):
             QMessageBox.critical(self, "Error", f"Invalid options:\n{str(e)}")
             return
 
-        # Determine output path
-        output_path = self.output_folder / f"{self.input_file.stem}_shorts.mp4"
-
-        # Confirm overwrite if exists
-        if output_path.exists():
-            reply = QMessageBox.question(
-                self,
-                "File Exists",
-                f"File already exists:\n{output_path.name}\n\nOverwrite?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            )
-            if reply == QMessageBox.StandardButton.No:
-                return
+        # Determine output path (the worker asks before overwriting)
+        output_path = Path(os.path.join(self.output_folder, self._input_stem + "_shorts.mp4"))
 
         # Disable UI
         self.is_processing = True
@@ -450,35 +878,76 @@ class ShortsConverterGUI(QMainWindow):
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
 
-        # Start conversion thread
-        self.processor_thread = VideoProcessorThread(None, self.input_file, output_path, options)
-        self.processor_thread.progress_updated.connect(self.update_progress)
-        self.processor_thread.processing_finished.connect(self.on_conversion_complete)
-        self.processor_thread.processing_failed.connect(self.on_conversion_error)
-        self.processor_thread.start()
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setVisible(True)
+
+        # Hand the job to the worker thread
+        self.processor_thread.submit(self.input_file, output_path, options)
+
+    def cancel_conversion(self):
+        """Ask the worker to abort the running conversion"""
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText("Cancelling...")
+        self.processor_thread.cancel()
+
+    def on_overwrite_requested(self, output_path: Path):
+        """Ask whether the worker may overwrite an existing output file"""
+        reply = QMessageBox.question(
+            self,
+            "File Exists",
+            f"File already exists:\n{output_path.name}\n\nOverwrite?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        self.processor_thread.answer_overwrite(reply == QMessageBox.StandardButton.Yes)
+
+    def on_conversion_cancelled(self):
+        """Called when the conversion was cancelled or overwriting was declined"""
+        self.is_processing = False
+        self.convert_btn.setEnabled(True)
+        self.cancel_btn.setVisible(False)
+        self.status_label.setText("Ready")
+        self.progress_bar.setVisible(False)
+
+    def on_phase_changed(self, phase: str):
+        """Animate the bar on its own while progress is unknown, track percents while encoding"""
+        if phase == "encoding":
+            self.progress_bar.setRange(0, 100)
+        else:
+            self.progress_bar.setRange(0, 0)
+
+    def update_progress(self, progress: int):
+        """Record the latest progress value; the bar is repainted on the next timer tick"""
+        # Reports still queued when the run ended must not repaint a finished bar
+        if not self.is_processing:
+            return
+        self._pending_progress = progress
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
 
-    def update_progress(self, progress: float):
-        """Update progress bar"""
-        self.progress_bar.setValue(int(progress))
+    def _flush_progress(self):
+        """Paint the most recent progress value"""
+        if self.is_processing:
+            self.progress_bar.setValue(self._pending_progress)
 
     def on_conversion_complete(self, output_path: Path):
         """Called when conversion completes successfully"""
         self.is_processing = False
         self.convert_btn.setEnabled(True)
+        self.cancel_btn.setVisible(False)
         self.status_label.setText("✓ Conversion complete!")
-        self.progress_bar.setValue(100)
+        # Hide the bar before the modal box so it is not painted at 100% and then removed
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setValue(0)
 
         QMessageBox.information(
             self, "Success", f"Video converted successfully!\n\nSaved to:\n{output_path}"
         )
 
-        self.progress_bar.setVisible(False)
-        self.progress_bar.setValue(0)
-
     def on_conversion_error(self, error_msg: str):
         """Called when conversion fails"""
         self.is_processing = False
         self.convert_btn.setEnabled(True)
+        self.cancel_btn.setVisible(False)
         self.status_label.setText("✗ Conversion failed")
         self.progress_bar.setVisible(False)
 
@@ -496,132 +965,30 @@ class ShortsConverterGUI(QMainWindow):
             "<p><a href='https://github.com/sl0thm4n/sh0rtifier'>GitHub</a></p>",
         )
 
-    def apply_styles(self):
-        """Apply custom stylesheet"""
-        self.setStyleSheet(
-            """
-            QMainWindow {
-                background-color: #2b2b2b;
-            }
-            QWidget {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            QScrollArea {
-                background-color: #2b2b2b;
-                border: none;
-            }
-            QLabel {
-                color: #ffffff;
-            }
-            QGroupBox {
-                font-weight: bold;
-                color: #ffffff;
-                border: 2px solid #4a4a4a;
-                border-radius: 6px;
-                margin-top: 12px;
-                padding-top: 15px;
-                background-color: #333333;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 15px;
-                padding: 0 8px;
-                color: #4da6ff;
-            }
-            QPushButton {
-                background-color: #0066cc;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 10px 20px;
-                font-weight: bold;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #0052a3;
-            }
-            QPushButton:pressed {
-                background-color: #003d7a;
-            }
-            QPushButton:disabled {
-                background-color: #555555;
-                color: #999999;
-            }
-            QRadioButton {
-                color: #ffffff;
-                spacing: 8px;
-            }
-            QRadioButton::indicator {
-                width: 18px;
-                height: 18px;
-            }
-            QRadioButton::indicator:checked {
-                background-color: #0066cc;
-                border: 2px solid #0066cc;
-                border-radius: 9px;
-            }
-            QRadioButton::indicator:unchecked {
-                background-color: #555555;
-                border: 2px solid #777777;
-                border-radius: 9px;
-            }
-            QDoubleSpinBox {
-                background-color: #3d3d3d;
-                color: #ffffff;
-                border: 1px solid #555555;
-                border-radius: 3px;
-                padding: 5px;
-            }
-            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {
-                background-color: #555555;
-                border: none;
-                width: 18px;
-            }
-            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #666666;
-            }
-            QProgressBar {
-                border: 2px solid #555555;
-                border-radius: 6px;
-                text-align: center;
-                height: 28px;
-                background-color: #3d3d3d;
-                color: #ffffff;
-                font-weight: bold;
-                font-size: 14px;
-            }
-            QProgressBar::chunk {
-                background-color: #0066cc;
-                border-radius: 4px;
-            }
-            QMenuBar {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            QMenuBar::item:selected {
-                background-color: #0066cc;
-            }
-            QMenu {
-                background-color: #2b2b2b;
-                color: #ffffff;
-                border: 1px solid #555555;
-            }
-            QMenu::item:selected {
-                background-color: #0066cc;
-            }
-        """
-        )
+    def closeEvent(self, event):  # noqa: N802 (Qt override)
+        """Stop the worker and any probe threads before the window goes away"""
+        self.processor_thread.stop()
+        self.processor_thread.wait()
+        # Probes cannot be interrupted, but they are short; a QThread must not
+        # be destroyed while it is still running
+        for probe_thread in self.findChildren(VideoProbeThread):
+            probe_thread.wait()
+        super().closeEvent(event)
 
 
 def main():
     """Main entry point for GUI"""
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
+    app.setStyleSheet(STYLESHEET)
 
     window = ShortsConverterGUI()
     window.show()
 
+    # Load core in the background once the window has painted, so the first
+    # probe does not wait for the import
+    QTimer.singleShot(0, warm_up_core)
+
     sys.exit(app.exec())
 
 
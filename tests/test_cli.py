@@ -0,0 +1,130 @@
+"""
+Unit tests for the sh0rtifier CLI folder metadata cache
+"""
+
+from typing import Any
+
+import pytest
+
+import cli
+from cli import CACHE_FILENAME, _load_cache, _save_cache, probe_videos
+from core import VideoInfo
+
+CACHED_INFO: dict[str, Any] = {
+    "duration": 90.0,
+    "width": 1920,
+    "height": 1080,
+    "fps": 30.0,
+    "has_audio": True,
+}
+
+# Cache entries for a.mp4 that must be treated as a miss, not crash browsing
+MALFORMED_ENTRY_CASES: tuple[object, ...] = (
+    5,  # not a dict
+    {"size": 4, "info": CACHED_INFO},  # missing mtime_ns
+    {"size": 4, "mtime_ns": 0},  # missing info
+)
+
+# Hand-edited info values that cannot be read as numbers
+BAD_INFO_FIELD_CASES: tuple[dict[str, Any], ...] = (
+    {"duration": "abc"},
+    {"width": None},
+    {"fps": [30]},
+)
+
+
+@pytest.fixture
+def video(tmp_path):
+    """A 4 byte stand-in video file"""
+    path = tmp_path / "a.mp4"
+    path.write_bytes(b"\x00" * 4)
+    return path
+
+
+@pytest.fixture
+def probed(monkeypatch):
+    """Replace get_video_info with a fake that records every probed path"""
+    calls = []
+
+    def fake_get_video_info(path):
+        calls.append(path)
+        return VideoInfo(path=path, duration=12.0, width=640, height=360, fps=25.0, has_audio=False)
+
+    monkeypatch.setattr(cli, "get_video_info", fake_get_video_info)
+    return calls
+
+
+def cache_entry(video, **info_overrides):
+    """Cache entry matching the video's current size and mtime"""
+    stat = video.stat()
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "info": {**CACHED_INFO, **info_overrides},
+    }
+
+
+def test_cache_hit_skips_probe(video, probed):
+    """Test an entry matching size and mtime is used without probing"""
+    cache = {video.name: cache_entry(video)}
+    (info,) = probe_videos([video], cache)
+
+    assert probed == []
+    assert info == VideoInfo(path=video, **CACHED_INFO)
+
+
+@pytest.mark.parametrize("field", ("size", "mtime_ns"))
+def test_cache_miss_on_changed_file(video, probed, field):
+    """Test a changed size or mtime probes the file again and updates the entry"""
+    entry = cache_entry(video)
+    entry[field] += 1
+    cache = {video.name: entry}
+    (info,) = probe_videos([video], cache)
+
+    assert probed == [video]
+    assert info.duration == 12.0
+    assert cache[video.name] == cache_entry(
+        video, duration=12.0, width=640, height=360, fps=25.0, has_audio=False, rotation=0
+    )
+
+
+@pytest.mark.parametrize("entry", MALFORMED_ENTRY_CASES)
+def test_malformed_cache_entry_is_probed_again(video, probed, entry):
+    """Test a stale or hand-edited entry falls back to probing"""
+    (info,) = probe_videos([video], {video.name: entry})
+
+    assert probed == [video]
+    assert info.duration == 12.0
+
+
+@pytest.mark.parametrize("bad_field", BAD_INFO_FIELD_CASES)
+def test_cache_entry_with_bad_value_is_probed_again(video, probed, bad_field):
+    """Test a current entry holding a wrongly typed value falls back to probing"""
+    (info,) = probe_videos([video], {video.name: cache_entry(video, **bad_field)})
+
+    assert probed == [video]
+    assert info.duration == 12.0
+
+
+def test_cache_entry_ignores_unknown_fields(video, probed):
+    """Test fields written by another version do not invalidate a current entry"""
+    (info,) = probe_videos([video], {video.name: cache_entry(video, codec="h264")})
+
+    assert probed == []
+    assert info == VideoInfo(path=video, **CACHED_INFO)
+
+
+def test_corrupt_cache_file_loads_empty(tmp_path):
+    """Test an unparsable or non-object cache file is ignored"""
+    (tmp_path / CACHE_FILENAME).write_text("{not json", encoding="utf-8")
+    assert _load_cache(tmp_path) == {}
+
+    (tmp_path / CACHE_FILENAME).write_text("[1, 2]", encoding="utf-8")
+    assert _load_cache(tmp_path) == {}
+
+
+def test_cache_round_trip(tmp_path):
+    """Test a saved cache loads back unchanged"""
+    cache = {"a.mp4": {"size": 4, "mtime_ns": 1, "info": CACHED_INFO}}
+    _save_cache(tmp_path, cache)
+    assert _load_cache(tmp_path) == cache
@@ -2,313 +2,530 @@
 Unit tests for sh0rtifier core functionality
 """
 
-import sys
+import dataclasses
+import queue
+import struct
+import threading
 from pathlib import Path
 
+import cv2
+import numpy as np
 import pytest
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from core import ConversionOptions, VideoInfo
-
-TEST_CLIP = "data/test.mp4"
-
-
-class TestVideoInfo:
-    """Test VideoInfo dataclass"""
-
-    def test_is_short_under_60(self):
-        """Test is_short property for videos under 60 seconds"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=45.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        assert video.is_short is True
-
-    def test_is_short_over_60(self):
-        """Test is_short property for videos over 60 seconds"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=90.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        assert video.is_short is False
-
-    def test_is_short_exactly_60(self):
-        """Test is_short property for videos exactly 60 seconds"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=60.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        assert video.is_short is False
-
-    def test_aspect_ratio(self):
-        """Test aspect ratio calculation"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=45.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        assert video.aspect_ratio == pytest.approx(16 / 9, rel=0.01)
-
-    def test_is_landscape(self):
-        """Test landscape detection"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=45.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        assert video.is_landscape is True
-
-        portrait_video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=45.0,
-            width=1080,
-            height=1920,
-            fps=30.0,
-            has_audio=True,
-        )
-        assert portrait_video.is_landscape is False
-
-
-class TestConversionOptions:
-    """Test ConversionOptions dataclass"""
-
-    def test_calculate_output_duration_with_speed(self):
-        """Test output duration calculation with speed adjustment"""
-        options = ConversionOptions(speed=2.0)
-        output = options.calculate_output_duration(120.0)
-        assert output == 60.0
-
-    def test_calculate_output_duration_with_segment(self):
-        """Test output duration calculation with segment"""
-        options = ConversionOptions(duration=30.0)
-        output = options.calculate_output_duration(120.0)
-        assert output == 30.0
-
-    def test_calculate_output_duration_segment_and_speed(self):
-        """Test output duration with both segment and speed"""
-        options = ConversionOptions(duration=60.0, speed=2.0)
-        output = options.calculate_output_duration(120.0)
-        assert output == 30.0
-
-    def test_validate_short_video(self):
-        """Test validation for videos under 60 seconds"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=45.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions()
-        is_valid, error = options.validate(video)
-        assert is_valid is True
-        assert error is None
-
-    def test_validate_long_video_with_speed(self):
-        """Test validation for long video with speed adjustment"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=120.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(speed=2.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is True
-        assert error is None
-
-    def test_validate_long_video_with_segment(self):
-        """Test validation for long video with segment"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=120.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(start_time=30.0, duration=40.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is True
-        assert error is None
-
-    def test_validate_exceeds_60_seconds(self):
-        """Test validation fails when output exceeds 60 seconds"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=120.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(speed=1.5)  # 120 / 1.5 = 80 seconds
-        is_valid, error = options.validate(video)
-        assert is_valid is False
-        assert "exceeds 60 seconds" in error.lower()
-
-    def test_validate_negative_start_time(self):
-        """Test validation fails for negative start time"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=120.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(start_time=-10.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is False
-        assert "start time" in error.lower()
-
-    def test_validate_start_exceeds_duration(self):
-        """Test validation fails when start time exceeds video duration"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=60.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(start_time=70.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is False
-        assert "exceeds video duration" in error.lower()
-
-    def test_validate_segment_exceeds_video(self):
-        """Test validation fails when segment exceeds video duration"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=60.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(start_time=50.0, duration=20.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is False
-        assert "exceeds" in error.lower()
-
-    def test_validate_invalid_speed(self):
-        """Test validation fails for invalid speed"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=60.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(speed=0.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is False
-        assert "speed" in error.lower()
-
-    def test_validate_negative_duration(self):
-        """Test validation fails for negative duration"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=60.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(duration=-10.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is False
-        assert "duration" in error.lower()
-
-
-class TestEdgeCases:
-    """Test edge cases and boundary conditions"""
-
-    def test_exactly_60_seconds_with_1x_speed(self):
-        """Test 60-second video at 1x speed"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=60.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(speed=1.0)
-        is_valid, error = options.validate(video)
-        assert is_valid is True  # 60 seconds exactly is valid for YouTube Shorts
-
-    def test_59_seconds_is_valid(self):
-        """Test 59-second video is valid"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=59.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions()
-        is_valid, error = options.validate(video)
-        assert is_valid is True
-
-    def test_very_short_video(self):
-        """Test very short video (1 second)"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=1.0,
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions()
-        is_valid, error = options.validate(video)
-        assert is_valid is True
-
-    def test_extreme_speed(self):
-        """Test with extreme speed values"""
-        video = VideoInfo(
-            path=Path(TEST_CLIP),
-            duration=240.0,  # 4 minutes
-            width=1920,
-            height=1080,
-            fps=30.0,
-            has_audio=True,
-        )
-        options = ConversionOptions(speed=4.0)  # 240 / 4 = 60
-        is_valid, error = options.validate(video)
-        assert is_valid is True  # Exactly 60 seconds is valid
-
-        options = ConversionOptions(speed=3.99)  # 240 / 3.99 = 60.15 seconds
-        is_valid, error = options.validate(video)
-        assert is_valid is False  # Over 60 seconds is not valid
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+from core import (
+    ConversionOptions,
+    ValidationCode,
+    VideoInfo,
+    _fast_probe_mp4,
+    _pipeline_stage,
+    _rotation_filters,
+    _video_info_from_ffprobe,
+    apply_vertical_layout,
+    apply_vertical_layout_fused,
+    atempo_factors,
+    build_filter_complex,
+    make_frame_processor,
+    parse_bitrate,
+    resolve_segment,
+)
+
+TEST_CLIP_PATH = Path(__file__).parent.parent / "data" / "test.mp4"
+
+# (options, expected output seconds) for a 120 second source
+OUTPUT_DURATION_CASES: tuple[tuple[ConversionOptions, float], ...] = (
+    (ConversionOptions(speed=2.0), 60.0),  # speed only
+    (ConversionOptions(duration=30.0), 30.0),  # segment only
+    (ConversionOptions(duration=60.0, speed=2.0), 30.0),  # segment and speed
+)
+
+# (video seconds, speed, valid) around the 60 second output limit
+OUTPUT_LENGTH_CASES: tuple[tuple[float, float, bool], ...] = (
+    (60.0, 1.0, True),  # 60 seconds exactly is valid for YouTube Shorts
+    (59.0, 1.0, True),
+    (1.0, 1.0, True),  # very short video
+    (240.0, 4.0, True),  # 240 / 4 = 60 seconds exactly
+    (240.0, 3.99, False),  # 240 / 3.99 = 60.15 seconds
+)
+
+# Speeds no atempo chain can reach
+NON_POSITIVE_SPEEDS: tuple[float, ...] = (0.0, -1.0)
+
+# Frame shapes for the fused layout: letterboxed, and taller than 9:16 by an odd row count
+FUSED_LAYOUT_FRAME_SHAPES: tuple[tuple[int, int, int], ...] = ((48, 80, 3), (99, 40, 3))
+
+# (ffprobe stream fields, clockwise rotation) for clips rotated by a quarter turn
+ROTATION_FIELD_CASES: tuple[tuple[dict, int], ...] = (
+    # ffmpeg 5+ reports the display matrix counterclockwise
+    ({"side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]}, 90),
+    ({"tags": {"rotate": "270"}}, 270),  # older ffmpeg
+)
+
+# (clockwise rotation, filters that turn decoded frames upright)
+ROTATION_FILTER_CASES: tuple[tuple[int, list[str]], ...] = (
+    (0, []),
+    (90, ["transpose=clock"]),
+    (180, ["hflip", "vflip"]),
+    (270, ["transpose=cclock"]),
+)
+
+
+@pytest.fixture(scope="module")
+def base_video():
+    """A 45 second 1920x1080 landscape video with audio"""
+    return VideoInfo(
+        path=TEST_CLIP_PATH,
+        duration=45.0,
+        width=1920,
+        height=1080,
+        fps=30.0,
+        has_audio=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def default_options():
+    """ConversionOptions with every setting at its default (frozen, so safe to share)"""
+    return ConversionOptions()
+
+
+def make_video(base_video, **overrides):
+    """Copy of base_video with the given fields replaced"""
+    return dataclasses.replace(base_video, **overrides)
+
+
+# VideoInfo dataclass
+def test_is_short_under_60(base_video):
+    """Test is_short property for videos under 60 seconds"""
+    assert base_video.is_short is True
+
+
+def test_is_short_over_60(base_video):
+    """Test is_short property for videos over 60 seconds"""
+    video = make_video(base_video, duration=90.0)
+    assert video.is_short is False
+
+
+def test_is_short_exactly_60(base_video):
+    """Test is_short property for videos exactly 60 seconds"""
+    video = make_video(base_video, duration=60.0)
+    assert video.is_short is False
+
+
+def test_aspect_ratio(base_video):
+    """Test aspect ratio calculation"""
+    assert base_video.aspect_ratio == pytest.approx(16 / 9, rel=0.01)
+
+
+def test_is_landscape(base_video):
+    """Test landscape detection"""
+    assert base_video.is_landscape is True
+
+    portrait_video = make_video(base_video, width=1080, height=1920)
+    assert portrait_video.is_landscape is False
+
+
+def test_suggested_speed_fits_59_seconds(base_video):
+    """Test suggested speed leaves a 1 second margin under the limit"""
+    video = make_video(base_video, duration=118.0)
+    assert video.suggested_speed == 2.0  # 118 / 59 is exact
+
+
+# ConversionOptions dataclass
+@pytest.mark.parametrize("options, expected", OUTPUT_DURATION_CASES)
+def test_calculate_output_duration(options, expected):
+    """Test output duration of a 120s video with speed and/or segment"""
+    assert options.calculate_output_duration(120.0) == expected
+
+
+def test_options_are_immutable():
+    """Test options cannot be changed after their derived fields are computed"""
+    options = ConversionOptions(blur_kernel=98)
+    assert options.blur_ksize == 99
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        options.blur_kernel = 51  # type: ignore[misc]
+
+
+def test_brightness_lut_clips_instead_of_abs():
+    """Test background brightness LUT clips negative levels to black"""
+    options = ConversionOptions(blur_brightness=0.6, blur_darken=-50)
+    assert options.brightness_lut.shape == (256,)
+    assert options.brightness_lut[0] == 0
+    assert options.brightness_lut[255] == 103
+
+
+def test_validate_short_video(base_video, default_options):
+    """Test validation for videos under 60 seconds"""
+    is_valid, error = default_options.validate(base_video)
+    assert is_valid is True
+    assert error is None
+
+
+def test_validate_long_video_with_speed(base_video):
+    """Test validation for long video with speed adjustment"""
+    video = make_video(base_video, duration=120.0)
+    options = ConversionOptions(speed=2.0)
+    is_valid, error = options.validate(video)
+    assert is_valid is True
+    assert error is None
+
+
+def test_validate_long_video_with_segment(base_video):
+    """Test validation for long video with segment"""
+    video = make_video(base_video, duration=120.0)
+    options = ConversionOptions(start_time=30.0, duration=40.0)
+    is_valid, error = options.validate(video)
+    assert is_valid is True
+    assert error is None
+
+
+def test_validate_exceeds_60_seconds(base_video):
+    """Test validation fails when output exceeds 60 seconds"""
+    video = make_video(base_video, duration=120.0)
+    options = ConversionOptions(speed=1.5)  # 120 / 1.5 = 80 seconds
+    assert options.check(video) is ValidationCode.EXCEEDS_60S
+    assert options.validate(video) == (
+        False,
+        "Output duration (80.0s) exceeds 60 seconds limit",
+    )
+
+
+def test_validate_negative_start_time(base_video):
+    """Test validation fails for negative start time"""
+    video = make_video(base_video, duration=120.0)
+    options = ConversionOptions(start_time=-10.0)
+    assert options.check(video) is ValidationCode.NEGATIVE_START
+
+
+def test_validate_start_exceeds_duration(base_video):
+    """Test validation fails when start time exceeds video duration"""
+    video = make_video(base_video, duration=60.0)
+    options = ConversionOptions(start_time=70.0)
+    assert options.check(video) is ValidationCode.START_EXCEEDS_DURATION
+
+
+def test_validate_segment_exceeds_video(base_video):
+    """Test validation fails when segment exceeds video duration"""
+    video = make_video(base_video, duration=60.0)
+    options = ConversionOptions(start_time=50.0, duration=20.0)
+    assert options.check(video) is ValidationCode.SEGMENT_EXCEEDS
+
+
+def test_validate_invalid_speed(base_video):
+    """Test validation fails for invalid speed"""
+    video = make_video(base_video, duration=60.0)
+    options = ConversionOptions(speed=0.0)
+    assert options.check(video) is ValidationCode.INVALID_SPEED
+
+
+def test_check_reports_option_errors_before_video_errors(base_video):
+    """Test a bad speed is reported even when the start is also past the end"""
+    video = make_video(base_video, duration=120.0)
+    options = ConversionOptions(start_time=200.0, speed=0.0)
+    assert options.check(video) is ValidationCode.INVALID_SPEED
+
+
+def test_check_rejects_invalid_speed_on_short_video(base_video):
+    """Test a non-positive speed is rejected even for videos under 60 seconds"""
+    assert ConversionOptions(speed=0.0).check(base_video) is ValidationCode.INVALID_SPEED
+    assert ConversionOptions(speed=-1.0).check(base_video) is ValidationCode.INVALID_SPEED
+
+
+def test_validate_negative_duration(base_video):
+    """Test validation fails for negative duration"""
+    video = make_video(base_video, duration=60.0)
+    options = ConversionOptions(duration=-10.0)
+    assert options.check(video) is ValidationCode.NEGATIVE_DURATION
+
+
+# Edge cases and boundary conditions
+@pytest.mark.parametrize("video_duration, speed, expected_valid", OUTPUT_LENGTH_CASES)
+def test_output_length_boundaries(base_video, video_duration, speed, expected_valid):
+    """Test validation right at and around the 60 second limit"""
+    video = make_video(base_video, duration=video_duration)
+    code = ConversionOptions(speed=speed).check(video)
+    assert (code is ValidationCode.OK) is expected_valid
+
+
+# ffmpeg filtergraph construction
+def test_resolve_segment_short_video_ignores_start(base_video):
+    """Test short videos are always converted in full"""
+    options = ConversionOptions(start_time=10.0, duration=20.0)
+    assert resolve_segment(base_video, options) == (0.0, 45.0)
+
+
+def test_resolve_segment_long_video(base_video):
+    """Test segment selection for long videos"""
+    video = make_video(base_video, duration=120.0)
+    assert resolve_segment(video, ConversionOptions(start_time=30.0, duration=40.0)) == (
+        30.0,
+        40.0,
+    )
+    assert resolve_segment(video, ConversionOptions(start_time=100.0)) == (100.0, 20.0)
+
+
+def test_filter_complex_landscape(base_video, default_options):
+    """Test landscape video is centered over blurred background"""
+    graph = build_filter_complex(base_video, default_options, 45.0)
+    assert "[bg]scale=1080:1920,gblur=sigma=80" in graph
+    assert "[fg]scale=1080:606[f]" in graph
+    assert "overlay=0:657" in graph
+    assert "fade=t=out:st=44.000:d=1.0" in graph
+    assert "afade=t=out:st=42.000:d=3.0" in graph
+
+
+def test_filter_complex_speed_without_audio(base_video):
+    """Test speed is applied and audio chain is omitted"""
+    video = make_video(base_video, duration=120.0, width=1080, height=1920, has_audio=False)
+    graph = build_filter_complex(video, ConversionOptions(speed=2.0), 60.0)
+    assert "setpts=PTS/2.0" in graph
+    assert "[0:a]" not in graph
+
+
+@pytest.mark.parametrize("rotation, expected", ROTATION_FILTER_CASES)
+def test_rotation_filters_turn_frames_upright(rotation, expected):
+    """Test the PyAV graph turns rotated clips upright before the layout is sized"""
+    assert _rotation_filters(rotation) == expected
+
+
+def test_atempo_factors_stay_in_range():
+    """Test large speed changes are split into chained atempo stages"""
+    assert atempo_factors(1.5) == [1.5]
+    factors = atempo_factors(5.0)
+    assert factors == [2.0, 2.0, 1.25]
+    assert all(0.5 <= f <= 2.0 for f in atempo_factors(0.3))
+    assert np.prod(atempo_factors(0.3)) == pytest.approx(0.3)
+
+
+@pytest.mark.parametrize("speed", NON_POSITIVE_SPEEDS)
+def test_atempo_factors_reject_non_positive_speed(speed):
+    """Test a speed that no atempo chain can reach raises instead of looping forever"""
+    with pytest.raises(ValueError):
+        atempo_factors(speed)
+
+
+def test_parse_bitrate():
+    """Test ffmpeg-style bitrate strings are converted to bits per second"""
+    assert parse_bitrate("8000k") == 8_000_000
+    assert parse_bitrate("8M") == 8_000_000
+    assert parse_bitrate("128000") == 128_000
+
+
+# Per-frame 9:16 layout
+def test_tall_frame_is_center_cropped():
+    """Test frames taller than 9:16 are cropped without a visible background"""
+    frame = np.zeros((40, 9, 3), dtype=np.uint8)
+    frame[:, :, 0] = np.arange(40, dtype=np.uint8)[:, None]
+    result = apply_vertical_layout(frame, 9, 16, 99, 80, 0.6, -50)
+    assert result.shape == (16, 9, 3)
+    assert np.array_equal(result, frame[12:28])
+
+
+def test_low_res_frame_keeps_target_size():
+    """Test low-resolution frames laid out at half size still fill the target"""
+    frame = np.full((27, 48, 3), 200, dtype=np.uint8)
+    result = apply_vertical_layout(frame, 108, 192, 9, 8, 0.6, -50)
+    assert result.shape == (192, 108, 3)
+    assert result[96, 54].tolist() == [200, 200, 200]
+    assert result[5, 54].tolist() == [70, 70, 70]
+
+
+def test_tiny_frame_is_upscaled_once(monkeypatch):
+    """Test a source under a quarter of the target width is still laid out at half size"""
+    sizes = []
+    real_resize = cv2.resize
+
+    def recording_resize(src, dsize, *args, **kwargs):
+        sizes.append(tuple(dsize))
+        return real_resize(src, dsize, *args, **kwargs)
+
+    monkeypatch.setattr(cv2, "resize", recording_resize)
+    frame = np.full((9, 16, 3), 200, dtype=np.uint8)
+    result = apply_vertical_layout(frame, 108, 192, 9, 8, 0.6, -50)
+
+    assert result.shape == (192, 108, 3)
+    assert (108, 192) in sizes and (54, 96) in sizes
+    assert (27, 48) not in sizes
+
+
+def test_blur_disabled_keeps_background_unblurred():
+    """Test blur_kernel=0 leaves the background as the plain stretched, darkened frame"""
+    options = ConversionOptions(target_width=90, target_height=160, blur_kernel=0, engine="moviepy")
+    frame = np.random.default_rng(0).integers(0, 256, (54, 96, 3), dtype=np.uint8)
+    result = make_frame_processor(options)(frame)
+
+    stretched = cv2.LUT(cv2.resize(frame, (90, 160)), options.brightness_lut)
+    assert np.array_equal(result[:55], stretched[:55])
+
+
+@pytest.mark.parametrize("frame_shape", FUSED_LAYOUT_FRAME_SHAPES)
+def test_fused_layout_matches_opencv_layout(frame_shape):
+    """Test the fused kernel renders within one level of apply_vertical_layout"""
+    options = ConversionOptions(target_width=36, target_height=64, blur_kernel=15, blur_sigma=16)
+    frame = np.random.default_rng(1).integers(0, 256, frame_shape, dtype=np.uint8)
+    out = np.empty((64, 36, 3), np.uint8)
+
+    fused = apply_vertical_layout_fused(frame, out, options)
+    expected = apply_vertical_layout(
+        frame,
+        36,
+        64,
+        options.blur_kernel,
+        options.blur_sigma,
+        options.blur_brightness,
+        options.blur_darken,
+        options.brightness_lut,
+    )
+    diff = np.abs(fused.astype(np.int16) - expected.astype(np.int16))
+    assert diff.max() <= 1
+
+
+# PyAV engine pipeline
+def test_pipeline_stage_end_marker_honours_stop():
+    """Test a stage whose queue is full when it finishes still exits once stopped"""
+    outbox: queue.Queue = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    stage = threading.Thread(target=_pipeline_stage, args=([1], outbox, stop), daemon=True)
+    stage.start()
+
+    # The only item fills the queue, so the end marker has nowhere to go
+    # until the consumer, which has given up here, reads again
+    stage.join(timeout=0.5)
+    assert outbox.full() and stage.is_alive()
+
+    stop.set()
+    stage.join(timeout=2)
+    assert not stage.is_alive()
+    assert outbox.get_nowait() == (False, 1)
+
+
+# Video metadata probing
+def mp4_box(box_type: bytes, *payload: bytes) -> bytes:
+    """Pack an MP4 box: 32-bit size, four-character type, then the payload"""
+    body = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def mp4_track(
+    handler: bytes,
+    codec: bytes,
+    timescale: int,
+    samples: int,
+    sample_delta: int,
+    size: tuple[int, int] = (0, 0),
+    rotated: bool = False,
+    mdhd_version: int = 0,
+) -> bytes:
+    """Pack a trak box with the tkhd, mdhd, hdlr, stsd and stts boxes the probe reads"""
+    # Display matrix: identity, or a 90 degree rotation (a = d = 0)
+    one = 0x10000
+    matrix = (
+        (0, one, 0, -one, 0, 0, 0, 0, 0x40000000)
+        if rotated
+        else (one, 0, 0, 0, one, 0, 0, 0, 0x40000000)
+    )
+    tkhd = mp4_box(
+        b"tkhd",
+        bytes(40),  # version/flags, times, track id, duration, layer, volume
+        struct.pack(">9i", *matrix),
+        struct.pack(">II", size[0] << 16, size[1] << 16),
+    )
+    duration = samples * sample_delta
+    if mdhd_version == 1:
+        mdhd_fields = struct.pack(">I16xIQ", 1 << 24, timescale, duration)
+    else:
+        mdhd_fields = struct.pack(">I8xII", 0, timescale, duration)
+    stbl = mp4_box(
+        b"stbl",
+        mp4_box(b"stsd", struct.pack(">II", 0, 1), mp4_box(codec)),
+        mp4_box(b"stts", struct.pack(">IIII", 0, 1, samples, sample_delta)),
+    )
+    mdia = mp4_box(
+        b"mdia",
+        mp4_box(b"mdhd", mdhd_fields, bytes(4)),
+        mp4_box(b"hdlr", bytes(8), handler, bytes(13)),
+        mp4_box(b"minf", stbl),
+    )
+    return mp4_box(b"trak", tkhd, mdia)
+
+
+def write_mp4(path: Path, *tracks: bytes) -> Path:
+    """Write an MP4 with media data ahead of moov, so the reader has to skip mdat"""
+    path.write_bytes(
+        mp4_box(b"ftyp", b"isom", bytes(4), b"isomavc1")
+        + mp4_box(b"mdat", bytes(64))
+        + mp4_box(b"moov", *tracks)
+    )
+    return path
+
+
+def test_fast_probe_reads_mp4_boxes(tmp_path):
+    """Test duration, size, fps, audio and codec fields come from the moov box"""
+    path = write_mp4(
+        tmp_path / "landscape.mp4",
+        mp4_track(b"vide", b"avc1", 15360, 300, 512, size=(1280, 720)),
+        mp4_track(b"soun", b"mp4a", 48000, 470, 1024),
+    )
+    info = _fast_probe_mp4(path)
+
+    assert info.duration == 10.0
+    assert (info.width, info.height) == (1280, 720)
+    assert info.fps == 30.0
+    assert info.has_audio
+    assert [s["codec_name"] for s in info.raw["streams"]] == ["h264", "aac"]
+    assert info.raw["format"]["size"] == str(path.stat().st_size)
+
+
+def test_fast_probe_rotated_track_with_64_bit_mdhd(tmp_path):
+    """Test a 90 degree display matrix swaps the size and a version 1 mdhd is read"""
+    path = write_mp4(
+        tmp_path / "portrait.mov",
+        mp4_track(b"vide", b"hvc1", 600, 120, 20, size=(1920, 1080), rotated=True, mdhd_version=1),
+    )
+    info = _fast_probe_mp4(path)
+
+    assert info.duration == 4.0
+    assert (info.width, info.height) == (1080, 1920)
+    assert info.rotation == 90
+    assert info.fps == 30.0
+    assert not info.has_audio
+    assert info.raw["streams"][0]["codec_name"] == "hevc"
+
+
+def test_fast_probe_rejects_non_mp4_data(tmp_path):
+    """Test the MP4 box reader gives up on files without a moov box"""
+    path = tmp_path / "broken.mp4"
+    path.write_bytes(b"\x00\x00\x00\x10free" + b"\x00" * 8 + b"not a video")
+    assert _fast_probe_mp4(path) is None
+
+
+def test_ffprobe_output_parsed_from_one_call():
+    """Test video fields and audio presence both come from a single ffprobe result"""
+    data = {
+        "streams": [
+            {"codec_type": "audio"},
+            {
+                "codec_type": "video",
+                "width": 1920,
+                "height": 1080,
+                "r_frame_rate": "30000/1001",
+            },
+        ],
+        "format": {"duration": "75.5"},
+    }
+    info = _video_info_from_ffprobe(TEST_CLIP_PATH, data)
+
+    assert info.duration == 75.5
+    assert (info.width, info.height) == (1920, 1080)
+    assert info.fps == pytest.approx(29.97, abs=0.01)
+    assert info.has_audio
+    assert info.raw is data
+
+
+@pytest.mark.parametrize("rotation_fields, rotation", ROTATION_FIELD_CASES)
+def test_ffprobe_rotated_video_reports_display_size(rotation_fields, rotation):
+    """Test ffprobe results for 90/270 degree rotated clips swap width and height"""
+    stream = {"codec_type": "video", "width": 1920, "height": 1080, "r_frame_rate": "30/1"}
+    data = {"streams": [{**stream, **rotation_fields}], "format": {"duration": "10.0"}}
+    info = _video_info_from_ffprobe(TEST_CLIP_PATH, data)
+    assert (info.width, info.height) == (1080, 1920)
+    assert info.rotation == rotation